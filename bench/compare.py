@@ -0,0 +1,69 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+    python -m bench.compare BASELINE.json CURRENT.json [--threshold 0.10]
+
+Exits with status 1 if any benchmark's median got slower than the threshold allows.
+"""
+import sys
+import json
+import argparse
+
+def compare(baseline, current, threshold=0.10):
+    """Returns a list of rows (name, base_s, current_s, ratio, status)."""
+    rows = []
+    base_results = baseline["results"]
+    for name, result in current["results"].items():
+        if name not in base_results:
+            rows.append((name, None, result["median"], None, "new"))
+            continue
+
+        base = base_results[name]["median"]
+        ratio = result["median"] / base if base else float("inf")
+        if ratio > 1 + threshold:
+            status = "REGRESSION"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((name, base, result["median"], ratio, status))
+
+    for name in base_results:
+        if name not in current["results"]:
+            rows.append((name, base_results[name]["median"], None, None, "missing"))
+    return rows
+
+def fmt_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results against a baseline.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed median slowdown (default: 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    with open(args.current, "r") as f:
+        current = json.load(f)
+
+    for key in ["bars", "tickers"]:
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"Warning: {key} differs ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':<22} {'base ms':>12} {'current ms':>12} {'ratio':>7}  status")
+    for name, base, cur, ratio, status in rows:
+        ratio_s = "-" if ratio is None else f"{ratio:.2f}x"
+        print(f"{name:<22} {fmt_ms(base):>12} {fmt_ms(cur):>12} {ratio_s:>7}  {status}")
+
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("No regressions.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
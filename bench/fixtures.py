@@ -0,0 +1,59 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+ZACKS_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "zacks")
+
+def synthetic_ohlcv(n_bars, seed=0, end="2025-12-31", tz="America/New_York"):
+    """Builds a yfinance-shaped daily OHLCV frame following a geometric random walk."""
+    rng = np.random.default_rng(seed)
+    index = pd.DatetimeIndex(pd.bdate_range(end=end, periods=n_bars, tz=tz), name="Date")
+
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    open_ = close * (1 + rng.normal(0, 0.005, n_bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n_bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n_bars)))
+    volume = rng.integers(1_000_000, 5_000_000, n_bars)
+
+    return pd.DataFrame({
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": volume,
+        "Dividends": 0.0,
+        "Stock Splits": 0.0
+    }, index=index)
+
+def synthetic_universe(n_tickers, n_bars):
+    """Builds {ticker: daily frame} with staggered listing dates."""
+    universe = {}
+    for i in range(n_tickers):
+        # Every third ticker listed later, to exercise NaN-aware alignment
+        bars = n_bars if i % 3 else max(n_bars // 2, 2)
+        universe[f"T{i:04d}"] = synthetic_ohlcv(bars, seed=i)
+    return universe
+
+def synthetic_record(ticker):
+    """Builds an analysis record shaped like data/tickers/<T>.json."""
+    return {
+        "company_name": f"{ticker} Inc.",
+        "segments": {"top_left": {"title": "Segment A", "content": "Demand - Price - Market Share"},
+                     "mid_left": {"title": "Segment B", "content": "Demand - Price - Market Share"}},
+        "product_mix": "A/B/C",
+        "main_customers": {"col1": {"title": "A", "names": ["X", "Y", "Z"]},
+                           "col2": {"title": "B", "names": ["U", "V", "W"]}},
+        "news": {"main_customer_news": "News placeholder...", "other_news": ["Competitor", "Partnerships"]},
+        "metrics": {"rank_info": "Zacks Rank: 3-Hold", "earnings_trend": "Up", "revisions": ["1 wk", "30 days"],
+                    "valuation": "Fair"},
+        "ai_stats": {"megatrend": "AI", "moat": "Scale", "bottleneck": "Supply", "exposure": "High"}
+    }
+
+def zacks_pages():
+    """Returns {name: html} for the saved Zacks quote pages."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(ZACKS_FIXTURE_DIR, "*.html"))):
+        with open(path, "r") as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
@@ -0,0 +1,154 @@
+"""
+Micro-benchmarks for the analysis, storage, chart and scraper hot paths.
+
+    python -m bench.run [--bars 2500] [--tickers 50] [--repeat 5] [--out bench/results/current.json]
+
+Runs entirely on synthetic OHLCV data and the saved Zacks pages in fixtures/zacks;
+all files are written to a scratch directory, never to data/ or output/.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import shutil
+import argparse
+import tempfile
+import statistics
+
+from .fixtures import synthetic_ohlcv, synthetic_universe, synthetic_record, zacks_pages
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+MIN_RUN_SECONDS = 0.05 # each timed run repeats the call until it takes at least this long
+
+def build_benchmarks(bars, tickers):
+    """Prepares fixtures and returns {name: zero-argument callable}."""
+    from src.yfi.analysis import calculate_emas, calculate_diffs, analyze_ticker, ema_panel, detect_crossovers, crossover_pairs, SPANS
+    from src.yfi.indicators import add_indicators, INDICATORS
+    from src.yfi.resample import to_weekly, to_monthly
+    from src.yfi import storage, columnar
+    from src.market_data import create_chart
+    from src.data_manager import save_ticker, load_data
+    from src.backtest import backtest_closes, parameter_grid, DEFAULT_FAST, DEFAULT_SLOW
+    from src.scraper import parse_zacks_html, extract_zacks_stream, CHUNK_SIZE
+
+    spans = SPANS["daily"]
+    daily = synthetic_ohlcv(bars)
+    weekly = to_weekly(daily)
+    monthly = to_monthly(daily)
+    with_emas = calculate_emas(daily, spans)
+    universe = synthetic_universe(tickers, bars)
+    for ticker in universe:
+        save_ticker(ticker, synthetic_record(ticker))
+    pages = list(zacks_pages().values())
+    storage.save_dataframes("BENCH", with_emas, weekly, monthly)
+    storage.flush()
+
+    def save_dataframes_cold():
+        # Forget previous content hashes and stored versions so every run really writes
+        storage._written_hashes.clear()
+        shutil.rmtree(os.path.join(columnar.OUTPUT_DIR, "BENCH"), ignore_errors=True)
+        storage.save_dataframes("BENCH", daily, weekly, monthly)
+        storage.flush()
+
+    def chunks(page):
+        return (page[i:i + CHUNK_SIZE] for i in range(0, len(page), CHUNK_SIZE))
+
+    return {
+        "calculate_emas": lambda: calculate_emas(daily, spans),
+        "calculate_diffs": lambda: calculate_diffs(with_emas, spans),
+        "detect_crossovers": lambda: detect_crossovers(with_emas, crossover_pairs(spans)),
+        "add_indicators": lambda: add_indicators(with_emas, INDICATORS["daily"]),
+        "analyze_ticker": lambda: analyze_ticker("BENCH", daily, weekly, monthly),
+        "ema_panel": lambda: ema_panel(universe, spans),
+        "create_chart": lambda: create_chart("BENCH", with_emas),
+        "create_chart_candles": lambda: create_chart("BENCH", with_emas, show_candles=True),
+        "save_dataframes": save_dataframes_cold,
+        "load_data": load_data,
+        "read_columnar": lambda: columnar.read_columnar("BENCH", "daily"),
+        "read_columnar_1y_close": lambda: columnar.read_columnar("BENCH", "daily", columns=["Close"], period="1Y"),
+        "backtest_grid": lambda: backtest_closes(daily["Close"].to_numpy(), *parameter_grid(DEFAULT_FAST, DEFAULT_SLOW)),
+        "zacks_parse": lambda: [parse_zacks_html(page) for page in pages],
+        "zacks_stream": lambda: [extract_zacks_stream(chunks(page)) for page in pages],
+    }
+
+def time_call(fn, repeat):
+    """Times fn; returns per-call seconds over `repeat` runs."""
+    fn() # warm-up
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_RUN_SECONDS or number >= 1_000_000:
+            break
+        number *= 10
+
+    runs = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - start) / number)
+
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "calls_per_run": number,
+        "runs": len(runs)
+    }
+
+def run(bars=2500, tickers=50, repeat=5, only=None):
+    """Runs the suite and returns the results document."""
+    import numpy as np
+    import pandas as pd
+
+    benchmarks = build_benchmarks(bars, tickers)
+    results = {}
+    for name, fn in benchmarks.items():
+        if only and name not in only:
+            continue
+        results[name] = time_call(fn, repeat)
+        print(f"{name:<22} median {results[name]['median'] * 1000:10.3f} ms")
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "bars": bars,
+            "tickers": tickers,
+            "repeat": repeat
+        },
+        "results": results
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the StockNexus micro-benchmarks.")
+    parser.add_argument("--bars", type=int, default=2500, help="Daily bars per synthetic ticker (default: 2500)")
+    parser.add_argument("--tickers", type=int, default=50, help="Synthetic tickers for universe benchmarks (default: 50)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5)")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--out", help="Results file (default: bench/results/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="stocknexus-bench-") as scratch:
+        # Must be set before src.config is imported
+        for name in ["DATA", "OUTPUT", "CACHE"]:
+            os.environ[f"STOCKNEXUS_{name}_DIR"] = os.path.join(scratch, name.lower())
+        doc = run(args.bars, args.tickers, args.repeat, args.only)
+
+    out = args.out or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"Results saved to {out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import time
+import streamlit as st
+from src.yfi.analysis import SPANS
+from src.screener import query_summary, load_summary, above, below
+
+st.set_page_config(page_title="StockNexus Screener", layout="wide", page_icon="📈")
+st.title("EMA Screener")
+st.caption("% distance of the last close from each EMA, for every ticker refreshed so far.")
+
+# --- Filters: one Above/Below choice per timeframe & EMA ---
+filters = []
+cols = st.columns(len(SPANS))
+for col, (tf, spans) in zip(cols, SPANS.items()):
+    with col:
+        st.markdown(f"**{tf.upper()}**")
+        choices = {span: st.segmented_control(f"EMA {span}", ["Any", "Above", "Below"], default="Any", key=f"{tf}_{span}")
+                   for span in spans}
+    filters += above(tf, [span for span, choice in choices.items() if choice == "Above"])
+    filters += below(tf, [span for span, choice in choices.items() if choice == "Below"])
+
+summary = load_summary()
+sort_c1, sort_c2 = st.columns([3, 1])
+with sort_c1:
+    sort_by = st.selectbox("Sort by", list(summary.columns), index=0)
+with sort_c2:
+    ascending = st.toggle("Ascending", value=False)
+
+start = time.perf_counter()
+result = query_summary(filters, sort_by=sort_by, ascending=ascending)
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+st.caption(f"{len(result)} of {len(summary)} tickers · {elapsed_ms:.1f} ms")
+st.dataframe(
+    result,
+    use_container_width=True,
+    column_config={
+        "updated_at": st.column_config.DatetimeColumn("Updated", format="YYYY-MM-DD HH:mm"),
+        **{c: st.column_config.NumberColumn(c.replace("_", " "), format="%.2f%%") for c in result.columns if c != "updated_at"}
+    }
+)
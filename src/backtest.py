@@ -0,0 +1,218 @@
+"""
+Vectorized EMA-crossover backtests over the stored bars.
+
+    python -m src.backtest [--timeframe daily] [--fast 1 9 21] [--slow 50 200] [--period 10Y] [--workers 4] [--tickers MU NVDA]
+
+Rule: long while EMA(fast) is above EMA(slow) at a bar's close, flat otherwise; the
+position is taken at that close and earns the next bar's return. A fast span of 1 is
+the close itself, so (1, 50) is "price above EMA 50". Every (fast, slow) pair of the
+grid is evaluated at once by broadcasting over a parameter axis; tickers are spread
+over worker processes, each memory-mapping its closes from the bar store. The bar store
+keeps every stored daily bar (the output store only the 2y the charts use); weekly and
+monthly bars are resampled from it.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from .config import CACHE_DIR, BARS_DIR
+from .yfi.analysis import ema_matrix
+from .yfi.bar_store import load_bars
+from .yfi.resample import to_weekly, to_monthly
+from .yfi.window import window
+
+BACKTEST_DIR = os.path.join(CACHE_DIR, "backtest")
+DEFAULT_FAST = [1, 5, 9, 12, 21, 26, 34, 50, 75, 100]
+DEFAULT_SLOW = [21, 26, 34, 50, 75, 100, 125, 150, 200, 250]
+BARS_PER_YEAR = {"daily": 252, "weekly": 52, "monthly": 12}
+RESAMPLE = {"weekly": to_weekly, "monthly": to_monthly}
+TICKERS_PER_TASK = 25 # tickers handed to a worker process at a time
+METRICS = ["total_return", "cagr", "max_drawdown", "sharpe", "trades", "exposure", "buy_hold_return"]
+
+def parameter_grid(fast_spans, slow_spans):
+    """Returns the (fast, slow) pairs of the grid with fast < slow, as two aligned arrays."""
+    pairs = [(f, s) for f in sorted(set(fast_spans)) for s in sorted(set(slow_spans)) if f < s]
+    if not pairs:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    fast, slow = zip(*pairs)
+    return np.array(fast), np.array(slow)
+
+def _close_matrix(closes):
+    """Stacks close series of different lengths into a (T, N) matrix, aligned on their last bar."""
+    n_rows = max(len(c) for c in closes)
+    matrix = np.full((n_rows, len(closes)), np.nan)
+    for i, close in enumerate(closes):
+        matrix[n_rows - len(close):, i] = close
+    return matrix
+
+def _positions(emas, spans, fast, slow):
+    """
+    Long/flat positions (T, P) for each (fast[i], slow[i]) rule from time-major EMAs (T, K).
+    Every fast EMA is compared with every slow EMA in one broadcast (T, F, S); the grid's
+    pairs are then picked from it.
+    """
+    fast_spans, fast_pos = np.unique(fast, return_inverse=True)
+    slow_spans, slow_pos = np.unique(slow, return_inverse=True)
+    fast_emas = emas[:, np.searchsorted(spans, fast_spans)]
+    slow_emas = emas[:, np.searchsorted(spans, slow_spans)]
+    above = fast_emas[:, :, None] > slow_emas[:, None, :]
+    return above.reshape(len(emas), -1)[:, fast_pos * len(slow_spans) + slow_pos]
+
+def _backtest(close, emas, spans, fast, slow, cost, bars_per_year):
+    position = _positions(emas, spans, fast, slow)
+    position &= np.arange(len(close))[:, None] >= slow
+
+    # Position at close t earns the return from t to t+1
+    held = position[:-1]
+    log_returns = np.log(close[1:] / close[:-1])
+    changes = np.diff(held, axis=0, prepend=False)
+    steps = np.where(held, log_returns[:, None], 0.0)
+    if cost:
+        steps += changes * np.log1p(-cost)
+
+    log_equity = np.cumsum(steps, axis=0)
+    peak = np.maximum.accumulate(log_equity, axis=0)
+    np.maximum(peak, 0.0, out=peak) # equity starts at 1, i.e. log 0
+    total = log_equity[-1]
+
+    years = len(log_returns) / bars_per_year
+    mean = steps.mean(axis=0)
+    std = steps.std(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(bars_per_year), np.nan)
+
+    return {
+        "total_return": np.expm1(total),
+        "cagr": np.expm1(total / years),
+        "max_drawdown": np.expm1((log_equity - peak).min(axis=0)),
+        "sharpe": sharpe,
+        "trades": np.count_nonzero(changes & held, axis=0),
+        "exposure": np.count_nonzero(held, axis=0) / len(held),
+        "buy_hold_return": np.full(len(fast), close[-1] / close[0] - 1)
+    }
+
+def backtest_closes(close, fast, slow, cost=0.0, bars_per_year=252):
+    """
+    Backtests every (fast[i], slow[i]) crossover rule on one close series.
+    `cost` is charged as a fraction of equity on every entry and exit; a position still open
+    at the end is marked to the last close. Each rule stays flat for its first `slow` bars
+    while the slow EMA warms up.
+    Returns {metric: array over the parameter axis}.
+    """
+    return backtest_many([close], fast, slow, cost, bars_per_year)[0]
+
+def backtest_many(closes, fast, slow, cost=0.0, bars_per_year=252):
+    """backtest_closes for several close series; their EMAs are computed together in one pass."""
+    closes = [np.asarray(c, dtype=float) for c in closes]
+    closes = [c[np.isfinite(c)] for c in closes]
+    fast, slow = np.asarray(fast), np.asarray(slow)
+    results = [{m: np.full(len(fast), np.nan) for m in METRICS} for _ in closes]
+    usable = [i for i, c in enumerate(closes) if len(c) >= 2]
+    if not usable or len(fast) == 0:
+        return results
+
+    spans = np.union1d(fast, slow)
+    matrix = _close_matrix([closes[i] for i in usable])
+    emas = ema_matrix(matrix, spans) # (K, T, N)
+    for col, i in enumerate(usable):
+        n_rows = len(closes[i])
+        ticker_emas = np.ascontiguousarray(emas[:, -n_rows:, col].T) # time-major (T, K)
+        results[i] = _backtest(closes[i], ticker_emas, spans, fast, slow, cost, bars_per_year)
+    return results
+
+def load_closes(ticker, timeframe, period=None):
+    """Returns a ticker's closes for `timeframe` over its whole stored daily history (or the trailing `period`)."""
+    # Daily closes need only the Close column mapped; resampling needs the full bars
+    bars = load_bars(ticker, "1d", columns=None if timeframe in RESAMPLE else ["Close"])
+    if bars.empty:
+        return None
+    if timeframe in RESAMPLE:
+        bars = RESAMPLE[timeframe](bars)
+    if period:
+        bars = window(bars, period)
+    return bars["Close"].to_numpy()
+
+def backtest_tickers(tickers, timeframe, fast, slow, cost=0.0, period=None):
+    """Backtests the grid on each ticker's stored closes. Returns a (Ticker, fast, slow)-indexed frame."""
+    closes = {}
+    for ticker in tickers:
+        close = load_closes(ticker, timeframe, period)
+        if close is not None and len(close):
+            closes[ticker] = close
+
+    if not closes:
+        return pd.DataFrame(columns=METRICS, index=pd.MultiIndex.from_arrays([[], [], []], names=["Ticker", "fast", "slow"]))
+
+    results = backtest_many(list(closes.values()), fast, slow, cost, BARS_PER_YEAR[timeframe])
+    frames = [pd.DataFrame({"Ticker": ticker, "fast": fast, "slow": slow, **metrics})
+              for ticker, metrics in zip(closes, results)]
+    return pd.concat(frames, ignore_index=True).set_index(["Ticker", "fast", "slow"])
+
+def stored_tickers():
+    """Returns the tickers with daily bars in the bar store."""
+    return sorted(os.path.basename(os.path.dirname(path)) for path in glob.glob(os.path.join(BARS_DIR, "*", "1d.json")))
+
+def run(tickers=None, timeframe="daily", fast_spans=DEFAULT_FAST, slow_spans=DEFAULT_SLOW,
+        cost=0.0, period=None, workers=4):
+    """Runs the grid over tickers (default: every ticker in the bar store) and returns per-ticker results."""
+    tickers = tickers or stored_tickers()
+    fast, slow = parameter_grid(fast_spans, slow_spans)
+    chunks = [tickers[i:i + TICKERS_PER_TASK] for i in range(0, len(tickers), TICKERS_PER_TASK)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        frames = [backtest_tickers(chunk, timeframe, fast, slow, cost, period) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            task = partial(backtest_tickers, timeframe=timeframe, fast=fast, slow=slow, cost=cost, period=period)
+            frames = list(pool.map(task, chunks))
+
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames) if frames else backtest_tickers([], timeframe, fast, slow)
+
+def summarize(results):
+    """Aggregates per-ticker results per (fast, slow): medians of each metric, best parameters first."""
+    if results.empty:
+        return results
+    summary = results.groupby(level=["fast", "slow"])[METRICS].median()
+    summary["tickers"] = results.groupby(level=["fast", "slow"]).size()
+    return summary.sort_values("cagr", ascending=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest EMA crossover rules over the stored bars.")
+    parser.add_argument("--timeframe", choices=list(BARS_PER_YEAR), default="daily", help="Bars to test on (default: daily)")
+    parser.add_argument("--fast", type=int, nargs="+", default=DEFAULT_FAST, help="Fast EMA spans (1 = the close itself)")
+    parser.add_argument("--slow", type=int, nargs="+", default=DEFAULT_SLOW, help="Slow EMA spans")
+    parser.add_argument("--cost", type=float, default=0.0, help="Cost per entry/exit as a fraction, e.g. 0.001 (default: 0)")
+    parser.add_argument("--period", help="Test only the trailing period, e.g. 10Y (default: all stored bars)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--tickers", nargs="+", help="Test only these tickers instead of the whole store")
+    parser.add_argument("--top", type=int, default=20, help="Parameter sets to print (default: 20)")
+    args = parser.parse_args(argv)
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else None
+    start = time.perf_counter()
+    results = run(tickers, args.timeframe, args.fast, args.slow, args.cost, args.period, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if results.empty:
+        print("No stored bars to test.")
+        return 1
+
+    n_tickers = results.index.get_level_values("Ticker").nunique()
+    n_params = len(results) // n_tickers
+    print(f"{n_tickers} tickers x {n_params} parameter sets in {elapsed:.2f}s")
+    print(summarize(results).head(args.top).to_string(float_format=lambda x: f"{x:.4f}"))
+
+    os.makedirs(BACKTEST_DIR, exist_ok=True)
+    out = os.path.join(BACKTEST_DIR, f"{args.timeframe}-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+    results.to_csv(out)
+    print(f"Results saved to {out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
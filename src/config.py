@@ -6,14 +6,20 @@ REPO_NAME = "StockNexus"
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DATA_DIR = os.path.join(BASE_DIR, "data")
-OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+# Overridable via environment, e.g. to point benchmarks at a scratch directory
+DATA_DIR = os.environ.get("STOCKNEXUS_DATA_DIR", os.path.join(BASE_DIR, "data"))
+OUTPUT_DIR = os.environ.get("STOCKNEXUS_OUTPUT_DIR", os.path.join(BASE_DIR, "output"))
+CACHE_DIR = os.environ.get("STOCKNEXUS_CACHE_DIR", os.path.join(BASE_DIR, "cache"))
+BARS_DIR = os.path.join(CACHE_DIR, "bars") # Local bar store, keyed by ticker/interval
 SRC_DIR = os.path.join(BASE_DIR, "src")
 
 # Files
 CSV_FILE = os.path.join(BASE_DIR, "user_data.csv") # Keep user_data in root or move to data? Plan said data/ticker_data.json, let's keep user_data in root for now as it wasn't explicitly moved in plan, but ticker_data was.
-JSON_FILE = os.path.join(DATA_DIR, "ticker_data.json")
+JSON_FILE = os.path.join(DATA_DIR, "ticker_data.json") # Legacy single-file store, migrated into TICKERS_DIR
+TICKERS_DIR = os.path.join(DATA_DIR, "tickers") # One <TICKER>.json record per ticker
 
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
+os.makedirs(TICKERS_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
+os.makedirs(BARS_DIR, exist_ok=True)
@@ -1,54 +1,129 @@
+import os
+import copy
 import json
+import threading
 import streamlit as st
-from github import Github
-from .config import JSON_FILE, REPO_NAME
+from .config import JSON_FILE, TICKERS_DIR
+from .github_sync import get_commit_queue, dump_record
+from .yfi.storage import atomic_write
+from .tracing import span
 
-def load_data():
-    """Loads the JSON data from local file."""
+# ticker -> ((mtime_ns, size), record); re-read only when the file changed on disk
+_record_cache = {}
+_cache_lock = threading.Lock()
+_migration_checked = False
+_migration_lock = threading.Lock()
+MIGRATED_SUFFIX = ".migrated" # the legacy file is kept under this name once migrated
+
+def _ticker_path(ticker):
+    return os.path.join(TICKERS_DIR, f"{ticker}.json")
+
+def migrate_json_store(json_file=JSON_FILE, overwrite=False):
+    """
+    One-shot migration from the single ticker_data.json file to per-ticker records.
+    Existing records are kept unless `overwrite` is set. The legacy file is then renamed
+    to <file>.migrated, so records deleted later are not migrated back. Returns the number
+    of records written.
+    """
+    try:
+        with open(json_file, "r") as f:
+            legacy = json.load(f)
+    except FileNotFoundError:
+        return 0
+
+    written = 0
+    for ticker, record in legacy.items():
+        if overwrite or not os.path.exists(_ticker_path(ticker)):
+            save_ticker(ticker, record)
+            written += 1
+    try:
+        os.replace(json_file, json_file + MIGRATED_SUFFIX)
+    except FileNotFoundError:
+        pass # retired by another process migrating at the same time
+    return written
+
+def _ensure_migrated():
+    """
+    Runs the legacy migration the first time the store is used in this process.
+    Tickers that already have a record are skipped, so a partially migrated store
+    (e.g. one record saved before the rest were migrated) still gets the others.
+    """
+    global _migration_checked
+    if _migration_checked:
+        return
+    # Concurrent sessions wait for the migration rather than reading a half-filled store
+    with _migration_lock:
+        if not _migration_checked:
+            migrate_json_store()
+            _migration_checked = True
+
+def list_tickers():
+    """Returns the tickers that have a stored analysis record."""
+    _ensure_migrated()
     try:
-        with open(JSON_FILE, "r") as f:
-            return json.load(f)
+        names = os.listdir(TICKERS_DIR)
     except FileNotFoundError:
-        return {}
+        return []
+    return sorted(name[:-5] for name in names if name.endswith(".json"))
 
-def save_json_to_github(new_data):
-    """Saves the updated JSON to GitHub."""
+def load_ticker(ticker):
+    """Loads one ticker's analysis record, or None if it has none. Served from memory while the file is unchanged."""
+    with span("store.load_ticker", ticker=ticker, cache="hit") as s:
+        _ensure_migrated()
+        path = _ticker_path(ticker)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            s["cache"] = "miss"
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+
+        with _cache_lock:
+            cached = _record_cache.get(ticker)
+        if cached is None or cached[0] != version:
+            s["cache"] = "miss"
+            with open(path, "r") as f:
+                record = json.load(f)
+            cached = (version, record)
+            with _cache_lock:
+                _record_cache[ticker] = cached
+
+        # Callers (e.g. the admin form) edit records in place
+        return copy.deepcopy(cached[1])
+
+def save_ticker(ticker, record):
+    """Writes one ticker's analysis record atomically, formatted as the commit queue commits it."""
+    atomic_write(_ticker_path(ticker), dump_record(record))
+    with _cache_lock:
+        _record_cache.pop(ticker, None)
+
+def load_data():
+    """Loads every ticker's record into one dict (O(universe); prefer load_ticker)."""
+    with span("store.load_data") as s:
+        data = {ticker: load_ticker(ticker) for ticker in list_tickers()}
+        s["tickers"] = len(data)
+    return data
+
+def save_ticker_to_github(ticker, record, base=None, timeout=30):
+    """
+    Commits one ticker's record to GitHub through the shared commit queue.
+    Edits from concurrent sessions are batched into one commit and merged on conflict.
+    Returns the record as committed, or None on failure.
+    """
     token = st.secrets.get("GITHUB_TOKEN")
     if not token:
         st.error("GITHUB_TOKEN not found.")
-        return False
+        return None
     try:
-        g = Github(token)
-        user = g.get_user()
-        repo = user.get_repo(REPO_NAME)
-        # Note: We need to be careful with the path in the repo. 
-        # If the repo structure matches local, it should be data/ticker_data.json
-        # But previously it was likely in root. 
-        # For now, let's assume we want to update it where it was or where it should be.
-        # If we moved it locally, we should probably update it in the same relative path in repo if we want to mirror.
-        # However, the previous code used JSON_FILE which was just "ticker_data.json".
-        # Now JSON_FILE is absolute path. We need the relative path for GitHub.
-        
-        repo_path = "data/ticker_data.json" # Assuming we want to enforce this structure in repo too.
-        
-        try:
-            contents = repo.get_contents(repo_path)
-        except:
-            # If not in data/, try root
-            try:
-                contents = repo.get_contents("ticker_data.json")
-            except:
-                st.error("Could not find ticker_data.json in repo.")
-                return False
-
-        new_content = json.dumps(new_data, indent=2)
-        repo.update_file(contents.path, "Update ticker_data.json via Streamlit", new_content, contents.sha)
-        return True
+        return get_commit_queue(token).submit(ticker, record, base).result(timeout=timeout)
     except Exception as e:
         st.error(f"Error saving to GitHub: {e}")
-        return False
+        return None
 
 def save_local_data(data):
-    """Saves data to local JSON file."""
-    with open(JSON_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    """Saves every record in data to the local per-ticker store."""
+    for ticker, record in data.items():
+        save_ticker(ticker, record)
+
+if __name__ == "__main__":
+    print(f"Migrated {migrate_json_store()} records into {TICKERS_DIR}")
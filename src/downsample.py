@@ -0,0 +1,50 @@
+import numpy as np
+from .yfi.resample import to_weekly, to_monthly
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of `n_out` points that best preserve the visual shape of y(x).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    every = (n - 2) / (n_out - 2)
+
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+def downsample_series(series, n_out):
+    """Downsamples a time-indexed series to at most n_out points with LTTB."""
+    if len(series) <= n_out:
+        return series
+
+    x = (series.index.asi8 - series.index.asi8[0]) / 1e9
+    return series.iloc[lttb(x, series.to_numpy(dtype=float), n_out)]
+
+def aggregate_candles(df, max_bars):
+    """Aggregates daily OHLC bars to weekly, then monthly, until at most max_bars remain."""
+    if len(df) <= max_bars:
+        return df
+
+    weekly = to_weekly(df)
+    if len(weekly) <= max_bars:
+        return weekly
+    return to_monthly(df)
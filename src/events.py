@@ -0,0 +1,108 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+from .config import OUTPUT_DIR
+from .yfi.storage import load_events
+from .yfi.window import last_completed_bar
+from .frame_store import FrameStore
+
+# Cross-ticker crossover index: one row per (ticker, timeframe, event)
+EVENTS_INDEX_FILE = os.path.join(OUTPUT_DIR, "events.pkl")
+TIMEFRAMES = ["daily", "weekly", "monthly"]
+# Recency is counted from each event's Date when queried, so the index never goes stale
+COLUMNS = ["Ticker", "timeframe", "Date", "fast", "slow", "direction", "close"]
+BAR_PERIODS = {"weekly": "W-SUN", "monthly": "M"} # weekly bars are labeled with their Monday
+
+def _empty_index():
+    return pd.DataFrame(columns=COLUMNS).astype({"Date": "datetime64[us]", "close": float})
+
+def _upgrade(index):
+    """Drops the bars_ago column indexes written before recency was computed at query time."""
+    return index[COLUMNS]
+
+_store = FrameStore(EVENTS_INDEX_FILE, _empty_index, convert=_upgrade)
+
+def load_index():
+    """Returns the events index, re-reading the file only if another process rewrote it."""
+    return _store.load()
+
+def _index_rows(ticker, events):
+    frames = []
+    for tf, df in events.items():
+        if df.empty:
+            continue
+        # Wall-clock dates, so tickers from different exchanges share one column
+        dates = df["Date"].dt.tz_localize(None) if df["Date"].dt.tz is not None else df["Date"]
+        frames.append(df.assign(Ticker=ticker, timeframe=tf, Date=dates))
+    return frames
+
+def update_events(results):
+    """Replaces the indexed events of each ticker in {ticker: {timeframe: events}} and persists the index in the background."""
+    if not results:
+        return
+
+    frames = [frame for ticker, events in results.items() for frame in _index_rows(ticker, events)]
+
+    def replace(index):
+        index = index[~index["Ticker"].isin(list(results))]
+        return pd.concat([index] + frames, ignore_index=True)[COLUMNS] if frames else index
+
+    _store.update(replace)
+
+def rebuild_index():
+    """Rebuilds the index from every ticker's stored events.json files."""
+    results = {}
+    for path in glob.glob(os.path.join(OUTPUT_DIR, "*", "columnar")):
+        ticker = os.path.basename(os.path.dirname(path))
+        results[ticker] = {tf: load_events(ticker, tf) for tf in TIMEFRAMES}
+
+    _store.reset()
+    update_events(results)
+    return len(results)
+
+def sessions_ago(index, last_session=None):
+    """
+    Bars of each event's timeframe between its Date and the last completed session
+    (default: now's), 0 for an event on that session's bar.
+    """
+    last = pd.Timestamp(last_session or last_completed_bar())
+    dates = index["Date"].dt.normalize()
+    ago = np.zeros(len(index), dtype=int)
+
+    daily = (index["timeframe"] == "daily").to_numpy()
+    ago[daily] = np.busday_count(dates[daily].to_numpy().astype("datetime64[D]"), last.to_datetime64().astype("datetime64[D]"))
+    for timeframe, freq in BAR_PERIODS.items():
+        rows = (index["timeframe"] == timeframe).to_numpy()
+        ago[rows] = pd.Period(last, freq).ordinal - dates[rows].dt.to_period(freq).array.asi8
+    return pd.Series(np.maximum(ago, 0), index=index.index)
+
+def _column(value):
+    """Accepts an EMA span (21) or a column name ("EMA_21", "Close")."""
+    return f"EMA_{value}" if isinstance(value, int) else value
+
+def query_events(timeframe=None, fast=None, slow=None, direction=None, sessions=None, since=None, tickers=None):
+    """
+    Filters crossover events across tickers, newest first.
+    e.g. every daily 21/50 cross in the last 5 sessions:
+        query_events("daily", fast=21, slow=50, sessions=5)
+    `sessions` counts bars back from the last completed session (see sessions_ago); `since` is a date.
+    """
+    index = load_index()
+    mask = pd.Series(True, index=index.index)
+    if timeframe:
+        mask &= index["timeframe"] == timeframe
+    if fast is not None:
+        mask &= index["fast"] == _column(fast)
+    if slow is not None:
+        mask &= index["slow"] == _column(slow)
+    if direction:
+        mask &= index["direction"] == direction
+    if sessions is not None:
+        mask &= sessions_ago(index) < sessions
+    if since is not None:
+        mask &= index["Date"] >= pd.Timestamp(since)
+    if tickers:
+        mask &= index["Ticker"].isin(tickers)
+
+    return index[mask].sort_values(["Date", "Ticker"], ascending=[False, True])
@@ -0,0 +1,59 @@
+"""
+A DataFrame shared by all sessions and processes, persisted as a pickle.
+
+Each process keeps the frame in memory and re-reads the file only when another process
+has rewritten it (its mtime or size changed). Updates replace the in-memory frame at once
+and are written to disk by the write-behind thread. Used for the screener summary and
+the crossover events index.
+"""
+import os
+import pickle
+import threading
+import pandas as pd
+from .yfi.storage import write_behind, flush
+
+class FrameStore:
+    """Caches the pickled frame at `path`; `empty()` builds the frame used before anything is stored."""
+
+    def __init__(self, path, empty, convert=None):
+        self.path = path
+        self.empty = empty
+        self.convert = convert # applied to frames read from disk, e.g. to upgrade an older layout
+        self.lock = threading.RLock()
+        self._frame = None
+        self._version = None
+
+    def _file_version(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        """Returns the frame, re-reading the file only if another process rewrote it."""
+        with self.lock:
+            version = self._file_version()
+            if self._frame is None or (version is not None and version != self._version):
+                try:
+                    frame = pd.read_pickle(self.path)
+                    self._frame = self.convert(frame) if self.convert else frame
+                except (FileNotFoundError, EOFError):
+                    self._frame = self.empty()
+                self._version = version
+            return self._frame
+
+    def update(self, change):
+        """Replaces the frame with change(frame) and persists it in the background. Returns the new frame."""
+        with self.lock:
+            frame = change(self.load())
+            self._frame = frame
+        write_behind(self.path, lambda: pickle.dumps(frame))
+        return frame
+
+    def reset(self):
+        """Empties the frame (e.g. before a rebuild); a pending background write is not re-read over it."""
+        flush()
+        with self.lock:
+            self._frame = self.empty()
+            self._version = self._file_version()
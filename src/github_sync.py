@@ -0,0 +1,285 @@
+import os
+import json
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import Future
+from github import Github, GithubException, InputGitTreeElement, UnknownObjectException
+from github.GitCommit import GitCommit
+from github.GitTree import GitTree
+from .config import REPO_NAME
+
+# Location of per-ticker records inside the repository (mirrors data/tickers/ locally)
+RECORDS_PATH = "data/tickers"
+LEGACY_PATH = "data/ticker_data.json" # single-file store the records were migrated from
+COMMIT_DELAY = 2.0 # seconds; edits arriving within this window share one commit
+MAX_RETRIES = 3
+
+class CommitConflict(Exception):
+    """The branch moved after the commit's parent was read."""
+
+def record_path(ticker):
+    return f"{RECORDS_PATH}/{ticker}.json"
+
+def dump_record(record):
+    return json.dumps(record, indent=2) + "\n"
+
+_MISSING = object()
+
+def merge_records(base, ours, theirs):
+    """
+    Three-way merge of a ticker record. Fields we changed since `base` win,
+    fields only the other side changed are kept, recursing into nested dicts.
+    """
+    if theirs is _MISSING or theirs == base:
+        return ours
+    if ours == base:
+        return theirs
+    if not all(isinstance(x, dict) for x in (base, ours, theirs)):
+        return ours
+
+    merged = {}
+    for key in list(theirs) + [k for k in ours if k not in theirs]:
+        value = merge_records(base.get(key, _MISSING), ours.get(key, _MISSING), theirs.get(key, _MISSING))
+        if value is not _MISSING:
+            merged[key] = value
+    return merged
+
+class GitHubBackend:
+    """
+    Commits files to a GitHub branch through the Git Data API, reusing one client.
+    A save costs one branch read, the record reads, and either one contents-API update
+    (a single file) or a tree, a commit and a ref update.
+    """
+
+    def __init__(self, token, repo_name=REPO_NAME, branch=None):
+        self.repo = Github(token).get_user().get_repo(repo_name)
+        self.branch = branch or self.repo.default_branch
+        self._ref = None # fetched on the first tree commit, then reused: edit() only needs its URL
+        self._tree = {} # head sha -> its tree sha, from the last head()
+        self._blobs = {} # (path, ref) -> blob sha (None if missing), from read()
+
+    def head(self):
+        # The branch carries its head commit's tree, so commit() needs no get_git_commit
+        commit = self.repo.get_branch(self.branch).commit
+        self._tree = {commit.sha: commit.commit.tree.sha}
+        self._blobs = {}
+        return commit.sha
+
+    def read(self, path, ref):
+        try:
+            content = self.repo.get_contents(path, ref=ref)
+        except UnknownObjectException:
+            self._blobs[(path, ref)] = None
+            return None
+        self._blobs[(path, ref)] = content.sha
+        return content.decoded_content.decode("utf-8")
+
+    def list_dir(self, path, ref):
+        try:
+            return {entry.name for entry in self.repo.get_contents(path, ref=ref)}
+        except UnknownObjectException:
+            return set()
+
+    def commit(self, parent, files, message):
+        """Commits {path: content, or None to delete the file} on top of `parent`."""
+        try:
+            if len(files) == 1 and (next(iter(files)), parent) in self._blobs:
+                return self._commit_file(parent, *next(iter(files.items())), message)
+            return self._commit_tree(parent, files, message)
+        except GithubException as e:
+            if e.status in (409, 422):
+                raise CommitConflict(str(e))
+            raise
+
+    def _commit_file(self, parent, path, content, message):
+        """Writes one file read at `parent`; GitHub rejects it (409) if the file changed since."""
+        sha = self._blobs[(path, parent)]
+        if content is None:
+            result = self.repo.delete_file(path, message, sha, branch=self.branch)
+        elif sha is None:
+            result = self.repo.create_file(path, message, content, branch=self.branch)
+        else:
+            result = self.repo.update_file(path, message, content, sha, branch=self.branch)
+        return result["commit"].sha
+
+    def _commit_tree(self, parent, files, message):
+        tree_sha = self._tree.get(parent) or self.repo.get_git_commit(parent).tree.sha
+        # Stand-ins carrying only the shas the API needs, so neither object is fetched
+        base_tree = GitTree(self.repo.requester, {}, {"sha": tree_sha}, completed=True)
+        parent_commit = GitCommit(self.repo.requester, {}, {"sha": parent}, completed=True)
+        # A null sha removes the path from the tree
+        elements = [InputGitTreeElement(path, "100644", "blob", sha=None) if content is None else
+                    InputGitTreeElement(path, "100644", "blob", content=content) for path, content in files.items()]
+        tree = self.repo.create_git_tree(elements, base_tree)
+        commit = self.repo.create_git_commit(message, tree, [parent_commit])
+        if self._ref is None:
+            self._ref = self.repo.get_git_ref(f"heads/{self.branch}")
+        # Not forced: GitHub rejects the update if the branch moved past `parent`
+        self._ref.edit(commit.sha, force=False)
+        return commit.sha
+
+class LocalGitBackend:
+    """Commits files to a local (bare) git repository with plumbing commands; stands in for GitHub."""
+
+    def __init__(self, repo_dir, branch="main"):
+        self.repo_dir = repo_dir
+        self.branch = branch
+
+    def _git(self, *args, input=None, env=None):
+        result = subprocess.run(["git", "--git-dir", self.repo_dir, *args], input=input,
+                                capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, args, result.stdout, result.stderr)
+        return result.stdout.strip()
+
+    def head(self):
+        return self._git("rev-parse", f"refs/heads/{self.branch}")
+
+    def read(self, path, ref):
+        try:
+            return self._git("cat-file", "-p", f"{ref}:{path}")
+        except subprocess.CalledProcessError:
+            return None
+
+    def list_dir(self, path, ref):
+        return {os.path.basename(name) for name in self._git("ls-tree", "--name-only", ref, f"{path}/").splitlines()}
+
+    def commit(self, parent, files, message):
+        fd, index_file = tempfile.mkstemp(prefix="stocknexus-index-")
+        os.close(fd)
+        os.unlink(index_file)
+        env = dict(os.environ, GIT_INDEX_FILE=index_file,
+                   GIT_AUTHOR_NAME="StockNexus", GIT_AUTHOR_EMAIL="stocknexus@localhost",
+                   GIT_COMMITTER_NAME="StockNexus", GIT_COMMITTER_EMAIL="stocknexus@localhost")
+        try:
+            self._git("read-tree", parent, env=env)
+            for path, content in files.items():
+                if content is None:
+                    # A zero mode removes the entry (--force-remove needs a work tree)
+                    self._git("update-index", "--index-info", input=f"0 {'0' * 40}\t{path}\n", env=env)
+                    continue
+                blob = self._git("hash-object", "-w", "--stdin", input=content)
+                self._git("update-index", "--add", "--cacheinfo", f"100644,{blob},{path}", env=env)
+            tree = self._git("write-tree", env=env)
+            sha = self._git("commit-tree", tree, "-p", parent, "-m", message, env=env)
+        finally:
+            if os.path.exists(index_file):
+                os.unlink(index_file)
+
+        try:
+            # Compare-and-swap: fails if the branch no longer points at `parent`
+            self._git("update-ref", f"refs/heads/{self.branch}", sha, parent)
+        except subprocess.CalledProcessError as e:
+            raise CommitConflict(e.stderr)
+        return sha
+
+class CommitQueue:
+    """
+    Debounces record edits into batched commits that touch only the changed tickers.
+    submit() returns a Future resolved with the record as committed (after merging
+    with any concurrent remote edit) once its batch lands.
+    """
+
+    def __init__(self, backend, delay=COMMIT_DELAY, max_retries=MAX_RETRIES):
+        self.backend = backend
+        self.delay = delay
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.pending = {} # ticker -> {"base", "record", "futures"}
+        self.timer = None
+        self.migrated = False # remote branch checked for legacy records without a per-ticker file
+
+    def submit(self, ticker, record, base=None):
+        """Queues an edit of one ticker's record. `base` is the record as it was before editing."""
+        future = Future()
+        with self.lock:
+            edit = self.pending.get(ticker)
+            if edit is None:
+                # Keep the earliest base so repeated edits merge against what was originally read
+                edit = self.pending[ticker] = {"base": base, "futures": []}
+            edit["record"] = record
+            edit["futures"].append(future)
+
+            if self.timer is None:
+                self.timer = threading.Timer(self.delay, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return future
+
+    def flush(self):
+        """Commits everything queued so far in one commit."""
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not batch:
+            return
+
+        try:
+            committed = self._commit_batch(batch)
+        except Exception as e:
+            for edit in batch.values():
+                for future in edit["futures"]:
+                    future.set_exception(e)
+            return
+
+        for ticker, edit in batch.items():
+            for future in edit["futures"]:
+                future.set_result(committed[ticker])
+
+    def _commit_batch(self, batch):
+        tickers = sorted(batch)
+        message = f"Update {', '.join(tickers)} via Streamlit"
+
+        for attempt in range(self.max_retries + 1):
+            parent = self.backend.head()
+            committed, files = {}, {}
+            for ticker in tickers:
+                edit = batch[ticker]
+                remote = self.backend.read(record_path(ticker), parent)
+                theirs = json.loads(remote) if remote is not None else _MISSING
+                base = edit["base"] if edit["base"] is not None else _MISSING
+                merged = merge_records(base, edit["record"], theirs)
+                committed[ticker] = merged
+                if theirs is _MISSING or merged != theirs:
+                    files[record_path(ticker)] = dump_record(merged)
+
+            migration = {} if self.migrated else self._migration_files(parent, tickers)
+            if not files and not migration:
+                self.migrated = True
+                return committed
+            try:
+                self.backend.commit(parent, {**migration, **files}, message)
+                self.migrated = True
+                return committed
+            except CommitConflict:
+                if attempt == self.max_retries:
+                    raise
+
+    def _migration_files(self, parent, tickers):
+        """
+        Records of the remote's legacy ticker_data.json that have no per-ticker file there yet,
+        and the legacy file's removal. The first commit carries them, so the branch never
+        tracks the edited tickers alone, and later syncs (from any process) do not migrate
+        deleted records back.
+        """
+        legacy = self.backend.read(LEGACY_PATH, parent)
+        if legacy is None:
+            return {}
+        existing = self.backend.list_dir(RECORDS_PATH, parent)
+        files = {record_path(ticker): dump_record(record) for ticker, record in json.loads(legacy).items()
+                 if ticker not in tickers and f"{ticker}.json" not in existing}
+        return {**files, LEGACY_PATH: None}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_commit_queue(token):
+    """Returns the process-wide commit queue, creating the GitHub client on first use."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = CommitQueue(GitHubBackend(token))
+        return _queue
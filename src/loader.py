@@ -0,0 +1,87 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from .scraper import scrape_zacks_data
+from .market_data import get_stock_data
+from .yfi.key_data import get_quote_data, get_profile_data
+
+# Per-source timeouts (seconds), measured from when the page load started
+TIMEOUTS = {
+    "history": 30,
+    "info": 10,
+    "profile": 10,
+    "zacks": 8
+}
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="page-load")
+_inflight = {} # (source, ticker) -> future of a call still running, shared by every session asking for it
+_inflight_lock = threading.Lock()
+
+def _submit(key, fn, *args):
+    """
+    Runs fn(*args) on the shared pool with the current Streamlit script context attached.
+    While a call for `key` is still running (e.g. one a rerun gave up on after its timeout),
+    its future is returned instead of queuing the same work again, so a slow source holds
+    at most one worker per ticker however often pages are reloaded.
+    """
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+
+        ctx = get_script_run_ctx()
+
+        def run():
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return fn(*args)
+
+        future = _executor.submit(run)
+        _inflight[key] = future
+    future.add_done_callback(lambda f: _forget(key, f))
+    return future
+
+def _forget(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+def start_page_loads(ticker):
+    """
+    Starts every network source the dashboard needs at once. Returns {source: future}.
+    Failures are raised by the futures and rendered by the page, not inside the workers.
+    """
+    return {
+        "history": _submit(("history", ticker), get_stock_data, ticker),
+        "info": _submit(("info", ticker), get_quote_data, ticker),
+        "profile": _submit(("profile", ticker), get_profile_data, ticker), # slow .info fields, filled into Key Data separately
+        "zacks": _submit(("zacks", ticker), scrape_zacks_data, ticker)
+    }
+
+def iter_page_loads(futures, timeouts=TIMEOUTS):
+    """
+    Yields (source, result, error) for each future as soon as it completes, or with a
+    TimeoutError once its timeout has passed. Timed-out calls keep running in the
+    background, so their results still land in the caches; a rerun meanwhile waits on
+    the same call rather than starting another.
+    """
+    start = time.monotonic()
+    pending = dict(futures)
+
+    while pending:
+        now = time.monotonic()
+        for source in [s for s in pending if now - start >= timeouts[s]]:
+            del pending[source]
+            yield source, None, TimeoutError(f"{source} did not respond within {timeouts[source]}s")
+        if not pending:
+            break
+
+        next_deadline = min(start + timeouts[s] for s in pending) - now
+        done, _ = wait(list(pending.values()), timeout=next_deadline, return_when=FIRST_COMPLETED)
+        for source, future in list(pending.items()):
+            if future in done:
+                del pending[source]
+                try:
+                    yield source, future.result(), None
+                except Exception as e:
+                    yield source, None, e
@@ -1,90 +1,175 @@
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import streamlit as st
 import os
 from .config import OUTPUT_DIR
-from .yfi.client import fetch_all_timeframes
-from .yfi.analysis import analyze_ticker
-from .yfi.storage import save_dataframes, save_analysis
+from .yfi.client import fetch_all_timeframes, fetch_incremental
+from .yfi.analysis import analyze_ticker, ticker_crossovers, calculate_emas, SPANS
+from .yfi.window import window, covers, last_completed_bar
+from .yfi.storage import save_dataframes, save_analysis, save_events, write_behind
+from .downsample import downsample_series, aggregate_candles
+from .screener import update_summary
+from .events import update_events
+from .tracing import span, annotate, traced
 
-def get_stock_data(ticker, period="1y"):
+# Memoization settings for the fetch + analyze pipeline
+CACHE_TTL = 900 # seconds; bounds staleness of the bar that is still forming
+CACHE_MAX_ENTRIES = 64
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _fetch_and_analyze(ticker, interval, last_bar):
     """
-    Fetches stock history and performs analysis.
-    Returns the stock object (mocked or minimal) and the daily history for compatibility.
+    Runs fetch -> analyze -> save for a ticker. Memoized on (ticker, interval, last completed bar),
+    so widget interactions within a session reuse the result instead of hitting the network.
+    The cache computes each key once: sessions opening the same ticker at the same time
+    wait for that run (fetch, analyze and save included) instead of repeating it.
+    As a cache_resource the result is shared, not copied, on every hit; it is read-only.
+    Raises ValueError if the provider returned no bars.
     """
-    try:
-        # 1. Fetch All Timeframes
+    annotate(cache="miss")
+
+    # 1. Fetch All Timeframes
+    with span("history.fetch", ticker=ticker):
         daily, weekly, monthly = fetch_all_timeframes(ticker)
-        
-        if daily.empty:
-            return None, pd.DataFrame()
-
-        # 2. Analyze
-        daily, weekly, monthly, analysis = analyze_ticker(ticker, daily, weekly, monthly)
-        
-        # 3. Save
+
+    if daily.empty:
+        # Raised rather than returned: the cache keeps only results, so the next call retries
+        raise ValueError(f"No data returned for {ticker}")
+
+    # 2. Analyze
+    with span("history.analyze", ticker=ticker):
+        daily, weekly, monthly, analysis = analyze_ticker(ticker, daily, weekly, monthly, incremental=True)
+        events = ticker_crossovers(daily, weekly, monthly)
+
+    # 3. Save
+    with span("history.save", ticker=ticker):
         save_dataframes(ticker, daily, weekly, monthly)
         save_analysis(ticker, analysis)
-        
-        # Return daily data for the chart, filtered to requested period if needed
-        # Note: fetch_all_timeframes fetches 2y for daily. 
-        # If period is "1y", we might want to slice it for the return value, 
-        # but the UI handles slicing for the chart.
-        # We need to return a "stock" object because UI expects it for info.
-        # Let's re-instantiate yf.Ticker just for the info part or refactor UI.
-        # For now, to minimize UI changes, let's just return yf.Ticker(ticker).
-        import yfinance as yf
-        stock = yf.Ticker(ticker)
-        
-        return stock, daily, analysis
-        
-    except Exception as e:
-        st.error(f"Error fetching data for {ticker}: {e}")
-        return None, pd.DataFrame(), {}
+        save_events(ticker, events)
+        update_summary({ticker: analysis})
+        update_events({ticker: events})
+
+    return daily, analysis
+
+@st.cache_resource(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _full_history(ticker, last_bar):
+    """
+    The ticker's whole daily history with EMA columns, for windows deeper than the
+    pipeline's 2y of daily bars. Memory-mapped from the bar store, which the pipeline has just
+    refreshed, so this normally makes no provider call.
+    """
+    with span("history.deep", ticker=ticker):
+        history = fetch_incremental(ticker, period="max", interval="1d")
+        return calculate_emas(history, SPANS["daily"])
+
+def invalidate_stock_data(ticker=None):
+    """Drops memoized pipeline results for one ticker, or for all tickers if none is given."""
+    if ticker is None:
+        _fetch_and_analyze.clear()
+        _full_history.clear()
+    else:
+        _fetch_and_analyze.clear(ticker, "1d", last_completed_bar())
+        _full_history.clear(ticker, last_completed_bar())
+
+def get_stock_data(ticker, period="1Y"):
+    """
+    Fetches stock history and performs analysis.
+    Returns the trailing `period` (1M, 3M, 6M, YTD, 1Y, 2Y, 3Y, 5Y, 10Y, MAX) of the daily
+    history with EMA columns, and the analysis dict. Windows within the pipeline's 2y of
+    daily bars are slices of it; deeper ones read the full stored history.
+    Errors (e.g. ValueError for a ticker without data) are raised for the caller to render,
+    since this also runs on the page loader's worker threads.
+    """
+    last_bar = last_completed_bar()
+    # The memoized pipeline marks the span as a miss when it actually runs
+    with span("history", ticker=ticker, cache="hit"):
+        daily, analysis = _fetch_and_analyze(ticker, "1d", last_bar)
+
+    if not covers(daily, period):
+        daily = _full_history(ticker, last_bar)
+    return window(daily, period), analysis
 
 def save_stock_data(ticker, hist):
     """Deprecated: Logic moved to src/yfi/storage.py. Kept for compatibility if needed."""
     pass 
 
-def create_chart(ticker, hist, show_candles=False):
-    """Creates a Plotly chart for the stock history."""
+# Chart rendering limits
+CHART_MAX_POINTS = 400 # Close line; about half the chart's pixel width, which LTTB keeps visually intact
+CHART_MAX_OVERLAY_POINTS = 100 # EMA lines are smooth, so far fewer points draw them
+CHART_MAX_CANDLES = 300 # candles need a few pixels each to stay readable; a year of daily sessions fits
+
+def _date_axis(index):
+    """
+    Converts a DatetimeIndex to epoch milliseconds (exchange wall time) for a date axis.
+    Plotly ships numeric arrays as compact binary, where ISO timestamps would be strings.
+    """
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.asi8 / 1e6
+
+def _values(series):
+    """Prices as float32: ample precision for a chart, at half the binary payload of float64."""
+    return series.to_numpy(dtype=np.float32)
+
+def create_chart(ticker, hist, show_candles=False, max_points=CHART_MAX_POINTS):
+    """
+    Creates a Plotly chart for the stock history.
+    Long histories are downsampled (LTTB for lines, weekly/monthly bars for candles, with
+    the EMA overlays thinned to the same number of points), keeping the figure payload
+    bounded. Pass max_points=None to draw every bar.
+    """
     if hist.empty:
         return None
 
+    with span("chart.build", ticker=ticker, candles=show_candles):
+        return _build_chart(hist, show_candles, max_points)
+
+def _build_chart(hist, show_candles, max_points):
+    def line(series, n_out):
+        return downsample_series(series, n_out) if max_points else series
+
     fig = go.Figure()
     if show_candles:
-        fig.add_trace(go.Candlestick(x=hist.index,
-                        open=hist['Open'],
-                        high=hist['High'],
-                        low=hist['Low'],
-                        close=hist['Close'],
+        candles = aggregate_candles(hist, CHART_MAX_CANDLES) if max_points else hist
+        fig.add_trace(go.Candlestick(x=_date_axis(candles.index),
+                        open=_values(candles['Open']),
+                        high=_values(candles['High']),
+                        low=_values(candles['Low']),
+                        close=_values(candles['Close']),
                         name='OHLC'))
         fig.update_layout(xaxis_rangeslider_visible=False)
+        # Overlays at most at the candles' resolution; daily EMAs would outweigh the aggregated candles
+        aggregated = len(candles) < len(hist)
+        overlay_points = min(len(candles), CHART_MAX_OVERLAY_POINTS) if aggregated else len(candles)
     else:
-        fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name='Close'))
+        close = line(hist['Close'], max_points)
+        fig.add_trace(go.Scatter(x=_date_axis(close.index), y=_values(close), mode='lines', name='Close'))
+        # EMAs are only thinned on histories long enough for the close to be thinned too
+        long_history = max_points and len(hist) > max_points
+        overlay_points = min(max_points, CHART_MAX_OVERLAY_POINTS) if long_history else max_points
     
     # Add EMAs to chart if they exist
     colors = {'EMA_9': 'blue', 'EMA_21': 'orange', 'EMA_50': 'red'}
     for col, color in colors.items():
         if col in hist.columns:
-            fig.add_trace(go.Scatter(x=hist.index, y=hist[col], mode='lines', name=col, line=dict(color=color, width=1)))
+            ema = line(hist[col], overlay_points)
+            fig.add_trace(go.Scatter(x=_date_axis(ema.index), y=_values(ema), mode='lines', name=col, line=dict(color=color, width=1)))
 
     fig.update_layout(
         height=400, 
         margin=dict(l=0, r=0, t=10, b=0),
+        xaxis_type='date',
         xaxis_title=None,
         yaxis_title=None
     )
     return fig
 
 def save_chart(ticker, fig):
-    """Saves the chart to HTML in output directory."""
+    """Saves the chart to HTML in output directory (written in the background)."""
     if not fig:
         return
 
-    ticker_dir = os.path.join(OUTPUT_DIR, ticker)
-    os.makedirs(ticker_dir, exist_ok=True)
-    
-    file_path = os.path.join(ticker_dir, "chart.html")
-    fig.write_html(file_path)
-
+    file_path = os.path.join(OUTPUT_DIR, ticker, "chart.html")
+    # A fixed div id keeps the HTML byte-identical for an unchanged figure, so rewrites are skipped
+    render = lambda: fig.to_html(div_id=f"chart-{ticker}")
+    write_behind(file_path, traced("chart.export", render, ticker=ticker))
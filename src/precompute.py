@@ -0,0 +1,143 @@
+"""
+Headless batch refresh of every ticker in the analysis store.
+
+    python -m src.precompute [--workers 4] [--resume] [--tickers MU NVDA]
+
+Each ticker runs fetch_all_timeframes -> analyze_ticker -> storage in a worker
+process. Progress is saved after every ticker so an interrupted run can be resumed.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from .config import CACHE_DIR
+from .data_manager import list_tickers
+from .screener import update_summary
+from .events import update_events
+from .yfi.client import fetch_all_timeframes
+from .yfi.analysis import analyze_ticker, ticker_crossovers
+from .yfi.storage import save_dataframes, save_analysis, save_events, atomic_write, flush
+
+PRECOMPUTE_DIR = os.path.join(CACHE_DIR, "precompute")
+PROGRESS_FILE = os.path.join(PRECOMPUTE_DIR, "progress.json")
+RUN_SUMMARY_FILE = os.path.join(PRECOMPUTE_DIR, "last_run.json")
+SUMMARY_BATCH = 50 # screener rows and crossover events are upserted in batches of this size
+
+def refresh_ticker(ticker):
+    """Fetches, analyzes and saves one ticker. Runs in a worker process; returns (analysis, events, seconds)."""
+    start = time.perf_counter()
+    daily, weekly, monthly = fetch_all_timeframes(ticker)
+    if daily.empty:
+        raise ValueError("No data returned")
+
+    daily, weekly, monthly, analysis = analyze_ticker(ticker, daily, weekly, monthly, incremental=True)
+    events = ticker_crossovers(daily, weekly, monthly)
+    save_dataframes(ticker, daily, weekly, monthly)
+    save_analysis(ticker, analysis)
+    save_events(ticker, events)
+    flush()
+    return analysis, events, time.perf_counter() - start
+
+def load_progress():
+    try:
+        with open(PROGRESS_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def save_progress(progress):
+    atomic_write(PROGRESS_FILE, json.dumps(progress, indent=2))
+
+def summarize(progress, wall_seconds):
+    """Builds the run summary: counts, failures and per-ticker timing percentiles."""
+    results = progress["results"]
+    ok = {t: r for t, r in results.items() if r["status"] == "ok"}
+    failed = {t: r["error"] for t, r in results.items() if r["status"] == "failed"}
+    timings = np.array([r["seconds"] for r in ok.values()]) if ok else np.array([0.0])
+
+    return {
+        "run_id": progress["run_id"],
+        "tickers": len(progress["tickers"]),
+        "succeeded": len(ok),
+        "failed": len(failed),
+        "failures": failed,
+        "wall_seconds": round(wall_seconds, 2),
+        "ticker_seconds": {
+            "mean": round(float(timings.mean()), 3),
+            "p50": round(float(np.percentile(timings, 50)), 3),
+            "p95": round(float(np.percentile(timings, 95)), 3),
+            "max": round(float(timings.max()), 3)
+        },
+        "slowest": sorted(ok, key=lambda t: ok[t]["seconds"], reverse=True)[:5]
+    }
+
+def run(tickers=None, workers=4, resume=False):
+    """
+    Refreshes tickers (default: the whole analysis store) and returns the run summary.
+    With `resume`, the last run continues; given tickers then narrow it to those of its
+    tickers that are still pending.
+    """
+    progress = load_progress() if resume else None
+    if progress is None:
+        progress = {
+            "run_id": time.strftime("%Y%m%d-%H%M%S"),
+            "tickers": sorted(tickers or list_tickers()),
+            "results": {}
+        }
+        save_progress(progress)
+    elif tickers:
+        unknown = sorted(set(tickers) - set(progress["tickers"]))
+        if unknown:
+            print(f"Not part of run {progress['run_id']}, skipped: {', '.join(unknown)}")
+
+    todo = [t for t in progress["tickers"] if progress["results"].get(t, {}).get("status") != "ok"
+            and (not tickers or t in tickers)]
+    print(f"Run {progress['run_id']}: {len(todo)} of {len(progress['tickers'])} tickers to refresh with {workers} workers")
+
+    start = time.perf_counter()
+    completed = {}
+    completed_events = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(refresh_ticker, ticker): ticker for ticker in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            ticker = futures[future]
+            try:
+                analysis, events, seconds = future.result()
+                progress["results"][ticker] = {"status": "ok", "seconds": round(seconds, 3)}
+                completed[ticker] = analysis
+                completed_events[ticker] = events
+            except Exception as e:
+                progress["results"][ticker] = {"status": "failed", "error": str(e)}
+            save_progress(progress)
+
+            if len(completed) >= SUMMARY_BATCH:
+                update_summary(completed)
+                update_events(completed_events)
+                completed = {}
+                completed_events = {}
+            print(f"[{i}/{len(todo)}] {ticker}: {progress['results'][ticker]['status']}")
+
+    update_summary(completed)
+    update_events(completed_events)
+    summary = summarize(progress, time.perf_counter() - start)
+    atomic_write(RUN_SUMMARY_FILE, json.dumps(summary, indent=2))
+    flush()
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute market data and EMA analysis for the coverage list.")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes (default: 4)")
+    parser.add_argument("--resume", action="store_true", help="Continue the last run, skipping tickers already refreshed (with --tickers: only those of them)")
+    parser.add_argument("--tickers", nargs="+", help="Refresh only these tickers instead of the whole store")
+    args = parser.parse_args(argv)
+
+    tickers = [t.upper() for t in args.tickers] if args.tickers else None
+    summary = run(tickers, workers=args.workers, resume=args.resume)
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,43 +1,224 @@
-import requests
+import os
 import re
-import streamlit as st
+import json
+import codecs
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from .config import CACHE_DIR
+from .yfi.atomic import atomic_write
+from .tracing import span
+from .singleflight import SingleFlight
 
-@st.cache_data(ttl=3600) # Cache for 1 hour
-def scrape_zacks_data(ticker):
-    """Scrapes Zacks Rank, Style Scores, and Industry Rank."""
-    url = f"https://www.zacks.com/stock/quote/{ticker}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
+ZACKS_URL = "https://www.zacks.com/stock/quote/{ticker}"
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Cache & throttling settings
+ZACKS_CACHE_DIR = os.path.join(CACHE_DIR, "zacks")
+CACHE_TTL = 3600 # Fresh for 1 hour
+STALE_TTL = 7 * 24 * 3600 # Older entries are served while a background refresh runs
+NEGATIVE_TTL = 300 # Failed scrapes are not retried on every render
+MAX_CONCURRENCY = 4
+CHUNK_SIZE = 16384
+RATE_LIMIT = 2.0 # Requests per second across all threads
+
+_session = None
+_session_lock = threading.Lock()
+_refreshing = set()
+_refresh_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="zacks")
+_flights = SingleFlight() # concurrent scrapes of one ticker share a single request
+
+class RateLimiter:
+    """Spaces out calls so that at most `rate` start per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+_rate_limiter = RateLimiter(RATE_LIMIT)
+
+def get_session():
+    """Returns the shared HTTP session, so connections to Zacks are pooled and reused."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+STYLES = ["Value", "Growth", "Momentum"]
+# Every field the quote page is scraped for, as (literal every match contains, pattern).
+# The literal is checked with a plain substring test first, so a buffer only pays for the
+# regex of a field that can actually match in it.
+ZACKS_FIELDS = {
+    "rank": ("rank_view", re.compile(r'<p class="rank_view">\s*([0-9]-[a-zA-Z ]+)')),
+    "style_header": ("Style Scores", re.compile(r'(Style Scores)')),
+    **{style: (f"</span>&nbsp;{style}", re.compile(r'>([A-F])</span>&nbsp;' + style)) for style in STYLES},
+    "industry": ('class="status"', re.compile(r'class="status">\s*(Top [0-9]+% \([0-9]+ out of [0-9]+\))'))
+}
+STREAM_TAIL = 512 # Characters kept between chunks so matches spanning a boundary are not lost
+
+def _format_zacks_info(found):
+    """Formats the fields found in a quote page as the Zacks info text."""
     info = []
+    if "rank" in found:
+        info.append(f"Zacks Rank: {found['rank'].strip()}")
+    if "style_header" in found:
+        scores = [f"{style}: {found[style]}" for style in STYLES if style in found]
+        if scores:
+            info.append(" | ".join(scores))
+    if "industry" in found:
+        info.append(f"Ind: {found['industry']}")
+    return "\n".join(info)
+
+def _search_fields(buf, found, final):
+    """Records the first match in buf of every field not found yet."""
+    for key, (literal, pattern) in ZACKS_FIELDS.items():
+        if key in found or literal not in buf:
+            continue
+        m = pattern.search(buf)
+        # Unless the stream has ended, a match touching the end of the buffer may continue in the next chunk
+        if m and (final or m.end() < len(buf)):
+            found[key] = m.group(1)
+
+def extract_zacks_stream(chunks):
+    """
+    Extracts Zacks fields from an iterable of text chunks, stopping as soon as
+    the rank, all three style scores, and the industry rank have been seen.
+    """
+    found = {}
+    buf = ""
+    for chunk in chunks:
+        buf += chunk
+        _search_fields(buf, found, final=False)
+        if len(found) == len(ZACKS_FIELDS):
+            break
+        buf = buf[-STREAM_TAIL:]
+    else:
+        _search_fields(buf, found, final=True)
+
+    return _format_zacks_info(found)
+
+def _iter_text(response):
+    """Decodes a streamed response body chunk by chunk."""
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+def parse_zacks_html(text):
+    """Extracts Zacks Rank, Style Scores, and Industry Rank from a quote page."""
+    found = {}
+    _search_fields(text, found, final=True)
+    return _format_zacks_info(found)
+
+def fetch_zacks_data(ticker):
+    """Scrapes Zacks Rank, Style Scores, and Industry Rank over the network (no cache)."""
     try:
-        r = requests.get(url, headers=headers, timeout=5)
-        if r.status_code != 200:
-            return None
-            
-        text = r.text
-        
-        # 1. Zacks Rank
-        rank_match = re.search(r'<p class="rank_view">\s*([0-9]-[a-zA-Z ]+)', text)
-        if rank_match:
-            info.append(f"Zacks Rank: {rank_match.group(1).strip()}")
-            
-        # 2. Style Scores
-        if "Style Scores" in text:
-            scores = []
-            for style in ["Value", "Growth", "Momentum"]:
-                m = re.search(r'>([A-F])</span>&nbsp;' + style, text)
-                if m:
-                    scores.append(f"{style}: {m.group(1)}")
-            if scores:
-                info.append(" | ".join(scores))
-                
-        # 3. Industry Rank
-        ind_match = re.search(r'class="status">\s*(Top [0-9]+% \([0-9]+ out of [0-9]+\))', text)
-        if ind_match:
-            info.append(f"Ind: {ind_match.group(1)}")
-            
-        return "\n".join(info)
+        _rate_limiter.wait()
+        # Streamed: the connection is closed as soon as every field has been found
+        with get_session().get(ZACKS_URL.format(ticker=ticker), timeout=5, stream=True) as r:
+            if r.status_code != 200:
+                return None
+            return extract_zacks_stream(_iter_text(r))
     except Exception as e:
         print(f"Scrape error: {e}")
         return None
+
+def _cache_path(ticker):
+    return os.path.join(ZACKS_CACHE_DIR, f"{ticker}.json")
+
+def _read_cache(ticker):
+    """Returns the cached entry ({"info", "fetched_at", "checked_at"}) or None."""
+    try:
+        with open(_cache_path(ticker), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def refresh_zacks_data(ticker):
+    """
+    Scrapes a ticker now and stores the result in the disk cache.
+    Concurrent refreshes of the same ticker (several sessions, background refreshes)
+    share one request and its result.
+    """
+    return _flights.do(ticker, _scrape_and_store, ticker)
+
+def _scrape_and_store(ticker):
+    with span("zacks.fetch", ticker=ticker) as s:
+        info = fetch_zacks_data(ticker)
+        s["found"] = bool(info)
+    now = time.time()
+    previous = _read_cache(ticker)
+    if not info and previous and previous["info"]:
+        # A failed scrape keeps the last good info; only the time it was checked moves on
+        entry = {**previous, "checked_at": now}
+    else:
+        entry = {"ticker": ticker, "info": info, "fetched_at": now, "checked_at": now}
+    atomic_write(_cache_path(ticker), json.dumps(entry))
+    return entry["info"]
+
+def _refresh_in_background(ticker):
+    """Schedules a refresh unless one is already running for this ticker."""
+    with _refresh_lock:
+        if ticker in _refreshing:
+            return
+        _refreshing.add(ticker)
+
+    def run():
+        try:
+            refresh_zacks_data(ticker)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(ticker)
+
+    _executor.submit(run)
+
+def scrape_zacks_data(ticker):
+    """
+    Returns Zacks Rank, Style Scores, and Industry Rank, served from the disk cache.
+    Stale entries are returned immediately while a background refresh runs;
+    only a missing (or very old) entry blocks on the network.
+    """
+    with span("zacks", ticker=ticker) as s:
+        entry = _read_cache(ticker)
+        if entry:
+            now = time.time()
+            ttl = CACHE_TTL if entry["info"] else NEGATIVE_TTL
+            if now - entry.get("checked_at", entry["fetched_at"]) < ttl:
+                s["cache"] = "hit"
+                return entry["info"]
+            if now - entry["fetched_at"] < STALE_TTL and entry["info"]:
+                s["cache"] = "stale"
+                _refresh_in_background(ticker)
+                return entry["info"]
+
+        s["cache"] = "miss"
+        return refresh_zacks_data(ticker)
+
+def scrape_many(tickers, max_workers=MAX_CONCURRENCY, force=False):
+    """
+    Scrapes a list of tickers concurrently, bounded by max_workers and the shared rate limit.
+    Cached entries are reused unless `force` is set. Returns {ticker: info}.
+    """
+    scrape = refresh_zacks_data if force else scrape_zacks_data
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(scrape, tickers)
+        return dict(zip(tickers, results))
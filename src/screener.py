@@ -0,0 +1,101 @@
+import os
+import glob
+import json
+import operator
+import pandas as pd
+from .config import OUTPUT_DIR
+from .yfi.analysis import SPANS
+from .frame_store import FrameStore
+
+# Materialized summary: one row per ticker, one pct_diff column per timeframe/EMA
+SUMMARY_FILE = os.path.join(OUTPUT_DIR, "summary.pkl")
+
+OPS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq
+}
+
+def summary_columns():
+    """Returns the pct_diff column names, e.g. daily_EMA_9."""
+    return [f"{tf}_EMA_{span}" for tf, spans in SPANS.items() for span in spans]
+
+def _empty_summary():
+    empty = pd.DataFrame(columns=summary_columns() + ["updated_at"], dtype=float).rename_axis("Ticker")
+    return empty.astype({"updated_at": "datetime64[us, UTC]"})
+
+def _upgrade(summary):
+    if not isinstance(summary["updated_at"].dtype, pd.DatetimeTZDtype):
+        # Summaries written before timestamps were stored hold epoch seconds
+        summary = summary.assign(updated_at=pd.to_datetime(summary["updated_at"], unit="s", utc=True))
+    return summary
+
+_store = FrameStore(SUMMARY_FILE, _empty_summary, convert=_upgrade)
+
+def load_summary():
+    """Returns the summary frame, re-reading the file only if another process rewrote it."""
+    return _store.load()
+
+def summary_row(analysis, updated_at=None):
+    """Flattens an analysis dict into a summary row, stamped with updated_at (a UTC Timestamp; default now)."""
+    row = {col: float("nan") for col in summary_columns()}
+    for tf, emas in analysis.items():
+        for key, values in emas.items():
+            col = f"{tf}_{key}"
+            if col in row:
+                row[col] = values["pct_diff"]
+    row["updated_at"] = updated_at if updated_at is not None else pd.Timestamp.now(tz="UTC")
+    return row
+
+def update_summary(results, updated_at=None):
+    """
+    Upserts {ticker: analysis} rows into the summary and persists it in the background.
+    `updated_at` optionally maps tickers to when their analysis was produced (default now).
+    """
+    if not results:
+        return
+
+    updated_at = updated_at or {}
+    rows = pd.DataFrame.from_dict({t: summary_row(a, updated_at.get(t)) for t, a in results.items()}, orient="index")
+    _store.update(lambda summary: pd.concat([summary.drop(rows.index, errors="ignore"), rows]).rename_axis("Ticker"))
+
+def rebuild_summary():
+    """Rebuilds the summary from every output/<T>/analysis.json on disk."""
+    results, updated_at = {}, {}
+    for path in glob.glob(os.path.join(OUTPUT_DIR, "*", "analysis.json")):
+        ticker = os.path.basename(os.path.dirname(path))
+        with open(path, "r") as f:
+            results[ticker] = json.load(f)
+        # Rows date from when the analysis was written, not from the rebuild
+        updated_at[ticker] = pd.Timestamp(os.stat(path).st_mtime_ns, unit="ns", tz="UTC")
+
+    _store.reset()
+    update_summary(results, updated_at)
+    return len(results)
+
+def above(tf, spans):
+    """Filters for Close above each of the given EMAs on a timeframe."""
+    return [(f"{tf}_EMA_{span}", ">", 0) for span in spans]
+
+def below(tf, spans):
+    """Filters for Close below each of the given EMAs on a timeframe."""
+    return [(f"{tf}_EMA_{span}", "<", 0) for span in spans]
+
+def query_summary(filters=(), sort_by=None, ascending=True, limit=None):
+    """
+    Filters and sorts the summary. `filters` is a list of (column, op, value)
+    tuples, e.g. above("daily", [9, 21, 50]) + below("weekly", [50]).
+    """
+    summary = load_summary()
+    mask = pd.Series(True, index=summary.index)
+    for column, op, value in filters:
+        mask &= OPS[op](summary[column], value)
+
+    result = summary[mask]
+    if sort_by:
+        result = result.sort_values(sort_by, ascending=ascending)
+    if limit:
+        result = result.head(limit)
+    return result
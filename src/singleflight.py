@@ -0,0 +1,79 @@
+"""
+Request coalescing for upstream calls that are not memoized by a Streamlit cache (which
+already computes each key once), i.e. Zacks scrapes.
+
+Concurrent calls with the same key share one execution: the first caller runs the
+function, later callers wait for it and receive the same result, or the same exception.
+Successful results are also handed out for a short grace window after the call
+finishes, which covers sessions that arrive just behind the leader.
+Shared results must be treated as read-only.
+"""
+import time
+import threading
+from concurrent.futures import Future
+
+DEFAULT_GRACE = 5.0 # seconds a finished result is reused for identical calls
+
+class SingleFlight:
+    """Coalesces concurrent calls by key."""
+
+    def __init__(self, grace=DEFAULT_GRACE):
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._calls = {} # key -> (future, finished_at or None)
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Returns fn(*args, **kwargs), sharing the call with any identical in-flight (or
+        just-finished) call for `key`. Exceptions propagate to every waiter but are not
+        reused by later calls.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                future, finished_at = call
+                if finished_at is None or time.monotonic() - finished_at < self.grace:
+                    leader = False
+                else:
+                    call = None
+            if call is None:
+                future = Future()
+                self._calls[key] = (future, None)
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if self.grace > 0:
+                self._calls[key] = (future, time.monotonic())
+            else:
+                self._calls.pop(key, None)
+            self._prune()
+        future.set_result(result)
+        return result
+
+    def forget(self, key=None):
+        """Drops the finished result for `key` (or all keys), so the next call goes upstream."""
+        with self._lock:
+            keys = list(self._calls) if key is None else [key]
+            for k in keys:
+                call = self._calls.get(k)
+                if call is not None and call[1] is not None:
+                    del self._calls[k]
+
+    def _prune(self):
+        """Removes results whose grace window has passed. Caller holds the lock."""
+        now = time.monotonic()
+        expired = [k for k, (_, finished_at) in self._calls.items()
+                   if finished_at is not None and now - finished_at >= self.grace]
+        for k in expired:
+            del self._calls[k]
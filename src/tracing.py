@@ -0,0 +1,226 @@
+"""
+Lightweight per-stage timing for the render pipeline.
+
+    with span("history.fetch", ticker=ticker) as s:
+        ...
+        s["cache"] = "hit"
+
+Every finished span is appended as one JSON line to cache/trace/spans.jsonl
+(shared by all sessions and processes), kept in an in-memory window for the
+Prometheus textfile, and summarized per stage (p50/p95, cache hit rate) by stage_stats().
+Log lines are buffered and written by the storage write-behind thread, so finishing a
+span never waits on disk.
+"""
+import os
+import glob
+import json
+import time
+import threading
+from collections import deque, defaultdict
+from contextlib import contextmanager
+import numpy as np
+from .config import CACHE_DIR
+
+TRACE_DIR = os.path.join(CACHE_DIR, "trace")
+SPAN_LOG = os.path.join(TRACE_DIR, "spans.jsonl")
+PROM_PATTERN = os.path.join(TRACE_DIR, "stocknexus_{pid}.prom") # one per process, for node_exporter's textfile collector
+LOG_MAX_BYTES = 5 * 1024 * 1024 # the log is rotated to spans.jsonl.1 beyond this size
+WINDOW = 1000 # recent durations kept in memory per stage
+PROM_INTERVAL = 15 # seconds between Prometheus textfile rewrites
+QUANTILES = [0.5, 0.95]
+
+_local = threading.local()
+_lock = threading.Lock()
+_recent = defaultdict(lambda: deque(maxlen=WINDOW))
+_totals = defaultdict(lambda: [0, 0.0]) # stage -> [count, seconds]
+_cache_counts = defaultdict(int) # (stage, result) -> count
+_buffer = [] # log entries not yet written
+_last_export = 0.0
+
+def prom_file(pid=None):
+    """This process's (or `pid`'s) Prometheus textfile."""
+    return PROM_PATTERN.format(pid=pid or os.getpid())
+
+def _reset_after_fork():
+    """A forked worker (e.g. a precompute process) starts its own counters rather than repeating its parent's."""
+    global _buffer, _last_export
+    _recent.clear()
+    _totals.clear()
+    _cache_counts.clear()
+    _buffer = []
+    _last_export = 0.0
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+def _stack():
+    if not hasattr(_local, "spans"):
+        _local.spans = []
+    return _local.spans
+
+@contextmanager
+def span(stage, **fields):
+    """
+    Times the enclosed block as `stage`. Yields the span's field dict, so the block can
+    attach details such as cache="hit". Spans nest per thread; exceptions are recorded and re-raised.
+    """
+    record = dict(fields)
+    stack = _stack()
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+        _finish(stage, duration, record, parent=len(stack) > 0)
+
+def annotate(**fields):
+    """Adds fields to the innermost open span on this thread (no-op outside a span)."""
+    stack = _stack()
+    if stack:
+        stack[-1].update(fields)
+
+def traced(stage, fn, **fields):
+    """Wraps fn so that each call runs inside a span; used for deferred work such as write-behind renders."""
+    def run(*args, **kwargs):
+        with span(stage, **fields):
+            return fn(*args, **kwargs)
+    return run
+
+def _finish(stage, duration, record, parent):
+    entry = {"ts": round(time.time(), 3), "stage": stage, "ms": round(duration * 1000, 3),
+             "pid": os.getpid(), "nested": parent}
+    entry.update(record)
+
+    with _lock:
+        _recent[stage].append(duration)
+        totals = _totals[stage]
+        totals[0] += 1
+        totals[1] += duration
+        if "cache" in record:
+            _cache_counts[(stage, record["cache"])] += 1
+        _buffer.append(entry)
+        export_due = time.time() - _last_export >= PROM_INTERVAL
+
+    # Imported here: storage traces its own writes, so it imports this module
+    from .yfi.storage import run_behind
+    run_behind(SPAN_LOG, flush_log)
+    if export_due:
+        run_behind(prom_file(), export_prometheus)
+
+def flush_log():
+    """Appends the buffered spans to the span log. Tracing must never break a page, so errors are printed only."""
+    global _buffer
+    with _lock:
+        entries, _buffer = _buffer, []
+    if not entries:
+        return
+
+    try:
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        if os.path.exists(SPAN_LOG) and os.path.getsize(SPAN_LOG) > LOG_MAX_BYTES:
+            os.replace(SPAN_LOG, SPAN_LOG + ".1")
+        with open(SPAN_LOG, "a") as f:
+            f.write("".join(json.dumps(entry, default=str) + "\n" for entry in entries))
+    except OSError as e:
+        print(f"Trace log error: {e}")
+
+def load_spans(since=None):
+    """Reads logged spans (current and rotated log), optionally only those newer than `since` (epoch seconds)."""
+    flush_log()
+    spans = []
+    for path in [SPAN_LOG + ".1", SPAN_LOG]:
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue # a line being written by another process
+                    if since is None or entry["ts"] >= since:
+                        spans.append(entry)
+        except FileNotFoundError:
+            continue
+    return spans
+
+def stage_stats(spans):
+    """Summarizes spans per stage: calls, p50/p95/max in ms, errors and cache hit rate."""
+    by_stage = defaultdict(list)
+    for entry in spans:
+        by_stage[entry["stage"]].append(entry)
+
+    rows = []
+    for stage, entries in sorted(by_stage.items()):
+        ms = np.array([e["ms"] for e in entries])
+        cached = [e["cache"] for e in entries if "cache" in e]
+        rows.append({
+            "stage": stage,
+            "calls": len(entries),
+            "p50_ms": round(float(np.percentile(ms, 50)), 2),
+            "p95_ms": round(float(np.percentile(ms, 95)), 2),
+            "max_ms": round(float(ms.max()), 2),
+            "errors": sum(1 for e in entries if "error" in e),
+            "cache_hit_rate": round(cached.count("hit") / len(cached), 3) if cached else None
+        })
+    return rows
+
+def export_prometheus(path=None):
+    """
+    Writes this process's stage timings and cache counters in the Prometheus text format,
+    labeled with its pid so the files of several processes can be collected side by side.
+    Files left by processes that have exited are removed.
+    """
+    global _last_export
+    path = path or prom_file()
+    pid = os.getpid()
+    with _lock:
+        _last_export = time.time()
+        recent = {stage: np.array(d) for stage, d in _recent.items()}
+        totals = {stage: list(t) for stage, t in _totals.items()}
+        cache_counts = dict(_cache_counts)
+
+    lines = [
+        "# HELP stocknexus_stage_seconds Duration of StockNexus pipeline stages.",
+        "# TYPE stocknexus_stage_seconds summary"
+    ]
+    for stage in sorted(totals):
+        for q in QUANTILES:
+            value = np.quantile(recent[stage], q)
+            lines.append(f'stocknexus_stage_seconds{{pid="{pid}",stage="{stage}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'stocknexus_stage_seconds_sum{{pid="{pid}",stage="{stage}"}} {totals[stage][1]:.6f}')
+        lines.append(f'stocknexus_stage_seconds_count{{pid="{pid}",stage="{stage}"}} {totals[stage][0]}')
+
+    lines += [
+        "# HELP stocknexus_cache_requests_total Cache lookups per stage and result.",
+        "# TYPE stocknexus_cache_requests_total counter"
+    ]
+    for (stage, result), count in sorted(cache_counts.items()):
+        lines.append(f'stocknexus_cache_requests_total{{pid="{pid}",stage="{stage}",result="{result}"}} {count}')
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{pid}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+        _remove_exited(path)
+    except OSError as e:
+        print(f"Prometheus export error: {e}")
+
+def _remove_exited(own_path):
+    """Deletes the textfiles of processes that are no longer running, so their last counters stop being scraped."""
+    for path in glob.glob(prom_file("*")):
+        if path == own_path:
+            continue
+        try:
+            os.kill(int(os.path.basename(path)[len("stocknexus_"):-len(".prom")]), 0)
+        except ProcessLookupError:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass # removed by another process
+        except (ValueError, PermissionError):
+            continue # not a pid file, or a live process of another user
@@ -1,96 +1,166 @@
+import time
 import streamlit as st
 import pandas as pd
 from .utils import fmt_num, fmt_range
 from .market_data import get_stock_data, create_chart, save_stock_data, save_chart
-from .scraper import scrape_zacks_data
-from .data_manager import save_json_to_github, save_local_data
-from .config import JSON_FILE
-import json
+from .scraper import refresh_zacks_data
+from .loader import iter_page_loads
+from .data_manager import save_ticker_to_github, save_ticker, load_ticker
+from .tracing import load_spans, stage_stats
 
-def render_dashboard(ticker, data, live_zacks_info):
-    """Renders the main dashboard."""
+def render_dashboard(ticker, record, loads):
+    """
+    Renders the main dashboard.
+    `loads` holds the futures from start_page_loads; each section is laid out up front
+    and filled in as soon as its data source completes. Sections are fragments that get
+    their data as arguments, so a widget inside one (e.g. the chart controls) reruns
+    only that section from the data it already has.
+    """
     
     # --- TOP ROW: Chart & Key Data ---
     top_c1, top_c2 = st.columns([2.5, 1])
     
     with top_c1:
-        # Controls Row
-        ctrl_c1, ctrl_c2 = st.columns([3, 1])
-        with ctrl_c1:
-            timeframe = st.pills("Timeframe", ["1M", "3M", "6M", "YTD", "1Y", "3Y", "5Y"], default="1Y", selection_mode="single", label_visibility="collapsed")
-        with ctrl_c2:
-            show_candles = st.toggle("Candlestick", value=False)
-        
-        period_map = {
-            "1M": "1mo", "3M": "3mo", "6M": "6mo", "YTD": "ytd",
-            "1Y": "1y", "3Y": "5y", "5Y": "5y"
-        }
-        yf_period = period_map.get(timeframe, "1y")
-
-        stock, hist, analysis = get_stock_data(ticker, period=yf_period)
-
-        if not hist.empty:
-            # Filter for 3Y manually
-            if timeframe == "3Y":
-                cutoff = pd.Timestamp.now(tz=hist.index.tz) - pd.DateOffset(years=3)
-                hist = hist[hist.index >= cutoff]
-            
-            # Save data and chart automatically on render
-            save_stock_data(ticker, hist)
-            
-            fig = create_chart(ticker, hist, show_candles)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
-                save_chart(ticker, fig)
-            
-            # Render EMA Analysis
-            render_ema_analysis(analysis)
-
-        else:
-            if stock is None:
-                 st.error("Ticker not found")
-            else:
-                 st.warning(f"No data found for {ticker}.")
+        chart_slot = st.empty()
+        chart_slot.caption("Loading chart...")
+        ema_slot = st.empty()
 
     with top_c2:
         # Key Data
         with st.container(border=True):
             st.markdown("**Key Data**")
-            if stock:
-                try:
-                    info = stock.info
-                    col_a, col_b = st.columns(2)
-                    
-                    with col_a:
-                        st.caption("Open")
-                        st.write(f"{info.get('open', 'N/A')}")
-                        st.caption("52-Wk Range")
-                        st.write(fmt_range(info.get('fiftyTwoWeekLow'), info.get('fiftyTwoWeekHigh')))
-                        st.caption("Market Cap")
-                        st.write(fmt_num(info.get('marketCap')))
-                        
-                    with col_b:
-                        st.caption("Day Range")
-                        st.write(fmt_range(info.get('dayLow'), info.get('dayHigh')))
-                        st.caption("Beta")
-                        st.write(f"{info.get('beta', 'N/A')}")
-                        st.caption("Dividend")
-                        div = info.get('dividendRate')
-                        yield_pct = info.get('dividendYield')
-                        if div:
-                            st.write(f"{div} ({yield_pct*100:.2f}%)")
-                        else:
-                            st.write("N/A")
-                except:
-                    st.error("Data unavailable")
-            else:
-                st.write("N/A")
+            key_slot = st.empty()
+            key_slot.caption("Loading...")
 
     st.divider()
 
     # --- BOTTOM ROW: Analysis Columns ---
-    if ticker in data:
-        t_data = data[ticker]
+    rank_slot = render_analysis_columns(ticker, record)
+
+    # Key Data shows its quote fields first; the slower .info profile fills in when it lands
+    key_parts = {}
+
+    # Fill sections in completion order
+    for source, result, error in iter_page_loads(loads):
+        if source == "history":
+            if error:
+                chart_slot.error(f"Error fetching data for {ticker}: {error}")
+                continue
+            hist, analysis = result
+            if hist.empty:
+                chart_slot.error("Ticker not found")
+                continue
+            with chart_slot.container():
+                render_chart_section(ticker)
+            with ema_slot.container():
+                render_ema_section(analysis)
+        elif source in ("info", "profile"):
+            key_parts[source] = None if error else result
+            if "info" in key_parts:
+                with key_slot.container():
+                    render_key_data(key_parts["info"], key_parts.get("profile"), "profile" not in key_parts)
+        elif source == "zacks" and rank_slot is not None:
+            with rank_slot.container():
+                render_rank_info(None if error else result, record.get("metrics", {}))
+
+@st.fragment
+def render_chart_section(ticker):
+    """
+    Chart controls and chart. Changing a control reruns only this fragment, which reads
+    the selected window from the memoized history (a slice of bars already loaded).
+    """
+    ctrl_c1, ctrl_c2 = st.columns([3, 1])
+    with ctrl_c1:
+        timeframe = st.pills("Timeframe", ["1M", "3M", "6M", "YTD", "1Y", "3Y", "5Y"], default="1Y", selection_mode="single", label_visibility="collapsed")
+    with ctrl_c2:
+        show_candles = st.toggle("Candlestick", value=False)
+
+    try:
+        hist, _ = get_stock_data(ticker, timeframe or "1Y")
+    except Exception as e:
+        st.error(f"Error fetching data for {ticker}: {e}")
+        return
+    render_chart(ticker, hist, show_candles)
+
+@st.fragment
+def render_ema_section(analysis):
+    """EMA table and indicator values."""
+    render_ema_analysis(analysis)
+    render_indicators(analysis)
+
+def render_chart(ticker, hist, show_candles):
+    """Renders the price chart for a window of get_stock_data's daily history."""
+    if not hist.empty:
+        # Save data and chart automatically on render
+        save_stock_data(ticker, hist)
+        
+        fig = create_chart(ticker, hist, show_candles)
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+            save_chart(ticker, fig)
+
+    else:
+        st.error("Ticker not found")
+
+@st.fragment
+def render_key_data(info, profile=None, profile_loading=False):
+    """
+    Renders the Key Data panel from a get_quote_data snapshot, plus the beta/dividend
+    fields from get_profile_data (shown as loading while that is still running).
+    """
+    if not info:
+        st.write("N/A")
+        return
+    info = {**info, **(profile or {})}
+
+    try:
+        col_a, col_b = st.columns(2)
+        
+        with col_a:
+            st.caption("Open")
+            st.write(f"{info.get('open', 'N/A')}")
+            st.caption("52-Wk Range")
+            st.write(fmt_range(info.get('fiftyTwoWeekLow'), info.get('fiftyTwoWeekHigh')))
+            st.caption("Market Cap")
+            st.write(fmt_num(info.get('marketCap')))
+            
+        with col_b:
+            st.caption("Day Range")
+            st.write(fmt_range(info.get('dayLow'), info.get('dayHigh')))
+            st.caption("Beta")
+            if profile_loading:
+                st.write("Loading...")
+            else:
+                st.write(f"{info.get('beta', 'N/A')}")
+            st.caption("Dividend")
+            div = info.get('dividendRate')
+            yield_pct = info.get('dividendYield')
+            if profile_loading:
+                st.write("Loading...")
+            elif div:
+                st.write(f"{div} ({yield_pct*100:.2f}%)")
+            else:
+                st.write("N/A")
+    except:
+        st.error("Data unavailable")
+
+def render_rank_info(live_zacks_info, metrics):
+    """Renders the Rank Info panel, preferring live Zacks data over the stored text."""
+    st.markdown("**Rank Info**")
+    if live_zacks_info:
+        st.write(live_zacks_info)
+        st.caption("✅ Live from Zacks")
+    else:
+        st.write(metrics.get("rank_info", ""))
+
+@st.fragment
+def render_analysis_columns(ticker, record):
+    """
+    Renders the bottom analysis columns from the ticker's stored record.
+    Returns the (still empty) Rank Info slot, or None if the ticker has no stored analysis.
+    """
+    if record:
+        t_data = record
         col1, col2, col3 = st.columns([1, 1, 1])
         
         # --- Column 1: Segments & Customers ---
@@ -138,12 +208,10 @@ def render_dashboard(ticker, data, live_zacks_info):
             metrics = t_data.get("metrics", {})
             
             with st.container(border=True):
-                st.markdown("**Rank Info**")
-                if live_zacks_info:
-                    st.write(live_zacks_info)
-                    st.caption("✅ Live from Zacks")
-                else:
-                    st.write(metrics.get("rank_info", ""))
+                rank_slot = st.empty()
+                with rank_slot.container():
+                    st.markdown("**Rank Info**")
+                    st.caption("Loading...")
                 
             with st.container(border=True):
                 st.markdown("**Earnings / Sales Trend**")
@@ -164,18 +232,22 @@ def render_dashboard(ticker, data, live_zacks_info):
                 st.markdown(f"**Moat:** {ai.get('moat', '')}")
                 st.markdown(f"**Bottleneck:** {ai.get('bottleneck', '')}")
                 st.markdown(f"**Exposure:** {ai.get('exposure', '')}")
+
+        return rank_slot
     else:
         st.info(f"No analysis data found for {ticker}. Login to create it.")
+        return None
 
-def render_admin(ticker, data):
-    """Renders the admin area."""
+@st.fragment
+def render_admin(ticker, record):
+    """Renders the admin area. Auto-Fetch reruns only this fragment; saving reruns the page."""
     st.divider()
     with st.expander("🔒 Admin: Edit Analysis"):
         st.success(f"Editing {ticker}")
         
         # Load existing or template
-        if ticker in data:
-            edit_data = data[ticker]
+        if record:
+            edit_data = record
         else:
             edit_data = {
                 "company_name": "", "segments": {"top_left": {}, "mid_left": {}},
@@ -186,7 +258,7 @@ def render_admin(ticker, data):
         # Auto-Fetch Button
         if st.button("✨ Auto-Fetch Zacks Data"):
             with st.spinner("Scraping Zacks..."):
-                zacks_info = scrape_zacks_data(ticker)
+                zacks_info = refresh_zacks_data(ticker)
                 if zacks_info:
                     edit_data["metrics"]["rank_info"] = zacks_info
                     st.success("Fetched Zacks Rank!")
@@ -236,12 +308,28 @@ def render_admin(ticker, data):
             edit_data["metrics"]["revisions"] = [x.strip() for x in revisions.split("\n") if x.strip()]
 
             if st.form_submit_button("Save Analysis"):
-                data[ticker] = edit_data
-                if save_json_to_github(data):
+                committed = save_ticker_to_github(ticker, edit_data, base=load_ticker(ticker))
+                if committed is not None:
                     st.success("Saved to GitHub!")
-                    save_local_data(data)
+                    save_ticker(ticker, committed)
                     st.rerun()
 
+@st.fragment
+def render_diagnostics():
+    """Renders per-stage timings (p50/p95 across all sessions) from the trace log."""
+    with st.expander("🩺 Admin: Diagnostics"):
+        window = st.selectbox("Window", ["Last hour", "Last 24 hours", "All logged"], index=1)
+        seconds = {"Last hour": 3600, "Last 24 hours": 86400}.get(window)
+        since = time.time() - seconds if seconds else None
+
+        rows = stage_stats(load_spans(since))
+        if not rows:
+            st.info("No timings recorded yet.")
+            return
+        st.dataframe(pd.DataFrame(rows).set_index("stage"), use_container_width=True)
+        st.caption("Nested stages (e.g. history.fetch) are included in their parent's time. "
+                   "Cache hit rate counts stale-but-served entries as misses.")
+
 def render_ema_analysis(analysis):
     """Renders the EMA analysis table."""
     if not analysis:
@@ -301,3 +389,16 @@ def render_ema_analysis(analysis):
                             """,
                             unsafe_allow_html=True
                         )
+
+def render_indicators(analysis):
+    """Renders the latest non-EMA indicator values (RSI, MACD, ATR, ...) per timeframe."""
+    indicators = (analysis or {}).get("indicators", {})
+    if not any(indicators.values()):
+        return
+
+    cols = st.columns(3)
+    for i, tf in enumerate(["daily", "weekly", "monthly"]):
+        with cols[i]:
+            values = {k: v for k, v in indicators.get(tf, {}).items() if not k.startswith("EMA_")}
+            lines = [f"{key.replace('_', ' ')}: **{value:,.2f}**" for key, value in values.items()]
+            st.caption("  \n".join(lines) if lines else "N/A")
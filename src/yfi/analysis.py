@@ -1,14 +1,96 @@
+import numpy as np
 import pandas as pd
+from .bar_store import load_ema_state, save_ema_state
+from .indicators import INDICATORS, ema_spans, ewm_columns, add_indicators, latest_values
+
+# EMA spans per timeframe, as declared in the indicator spec
+SPANS = {tf: ema_spans(specs) for tf, specs in INDICATORS.items()}
+
+# fetch_many interval -> analysis timeframe
+INTERVAL_TIMEFRAMES = {"1d": "daily", "1wk": "weekly", "1mo": "monthly"}
+
+def ema_matrix(values, spans, state=None):
+    """Computes EMAs of a (T, N) matrix for K spans in one pass, as a (K, T, N) array; `state` is (K, N) EMAs to continue from."""
+    # Matches Series.ewm(span, adjust=False, ignore_na=True): leading NaNs stay NaN, interior NaNs carry the EMA forward
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+
+    alphas = 2.0 / (np.asarray(spans, dtype=float) + 1.0)
+    n_rows, n_cols = values.shape
+    n_spans = len(spans)
+
+    # One smoothed column per (span, ticker), span-major
+    tiled = np.tile(values, (1, n_spans))
+    seed = None if state is None else np.asarray(state, dtype=float).reshape(n_spans * n_cols)
+    out = ewm_columns(tiled, np.repeat(alphas, n_cols), state=seed)
+    return out.reshape(n_rows, n_spans, n_cols).transpose(1, 0, 2)
+
+def ema_panel(panel, spans, column="Close"):
+    """
+    Computes EMAs for many tickers at once.
+    `panel` is either a (Ticker, Date)-indexed frame (as returned by fetch_many) or a
+    {ticker: DataFrame} dict. Closes are aligned on the union of dates so tickers with
+    different listing dates share one matrix; input frames are never copied or modified.
+    Returns a (Ticker, Date)-indexed frame of EMA_<span> columns covering each ticker's own dates.
+    """
+    if isinstance(panel, dict):
+        closes = pd.concat({t: df[column] for t, df in panel.items() if not df.empty}, axis=1)
+    else:
+        closes = panel[column].unstack("Ticker")
+
+    if closes.empty:
+        return pd.DataFrame(columns=[f'EMA_{span}' for span in spans])
+
+    values = closes.to_numpy(dtype=float)
+    emas = ema_matrix(values, spans)
+
+    # (K, T, N) -> rows ordered ticker-major, one column per span
+    n_rows, n_cols = values.shape
+    flat = emas.transpose(2, 1, 0).reshape(n_cols * n_rows, len(spans))
+    index = pd.MultiIndex.from_product([closes.columns, closes.index], names=["Ticker", "Date"])
+    present = ~np.isnan(values.T.reshape(-1))
+
+    return pd.DataFrame(flat[present], index=index[present], columns=[f'EMA_{span}' for span in spans])
 
 def calculate_emas(df, spans):
     """Calculates EMAs for the given spans and adds them to the dataframe."""
     if df.empty:
         return df
-    
-    df = df.copy()
-    for span in spans:
-        df[f'EMA_{span}'] = df['Close'].ewm(span=span, adjust=False).mean()
-    return df
+
+    emas = ema_matrix(df['Close'].to_numpy(dtype=float), spans)[:, :, 0]
+    return df.assign(**{f'EMA_{span}': emas[i] for i, span in enumerate(spans)})
+
+def update_emas(ticker, interval, df, spans):
+    """Adds EMA columns by advancing the persisted EMA state over new bars only; recomputes fully when the state does not fit df."""
+    if df.empty:
+        return df
+
+    cols = [f'EMA_{span}' for span in spans]
+    state = load_ema_state(ticker, interval)
+
+    # The state's last row may have been a bar still forming; advance from the one before it.
+    # A moved anchor close means history was revised. Once df's window slides past where the state
+    # was seeded, its first EMAs differ from a recompute over df alone; the gap decays every bar.
+    anchor = None
+    if len(state) >= 2 and list(state.columns) == ['Close'] + cols and state.index[0] <= df.index[0]:
+        candidate = state.index[-2]
+        if candidate in df.index and np.isclose(df.at[candidate, 'Close'], state.at[candidate, 'Close'], rtol=1e-9):
+            anchor = candidate
+
+    if anchor is not None:
+        new_bars = df.loc[df.index > anchor, 'Close']
+        seed = state.loc[anchor, cols].to_numpy(dtype=float)[:, None]
+        emas = ema_matrix(new_bars.to_numpy(dtype=float), spans, state=seed)[:, :, 0]
+        fresh = pd.DataFrame(emas.T, index=new_bars.index, columns=cols)
+        fresh.insert(0, 'Close', new_bars)
+        # Rows before df's window are no longer read; dropping them keeps the state bounded
+        state = pd.concat([state.loc[df.index[0]:anchor], fresh])
+    else:
+        state = calculate_emas(df[['Close']], spans)
+
+    save_ema_state(ticker, interval, state)
+    return df.assign(**{col: state[col].reindex(df.index) for col in cols})
 
 def calculate_diffs(df, spans):
     """Calculates % difference from Close to EMAs for the latest date."""
@@ -35,19 +117,89 @@ def calculate_diffs(df, spans):
             
     return diffs
 
-def analyze_ticker(ticker, daily_df, weekly_df, monthly_df):
-    """Orchestrates analysis for all timeframes."""
+def calculate_diff_series(df, spans):
+    """Adds PCT_DIFF_<span> columns: % difference from Close to each EMA on every bar."""
+    if df.empty:
+        return df
+
+    close = df['Close'].to_numpy(dtype=float)[:, None]
+    emas = df[[f'EMA_{span}' for span in spans]].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = np.where(emas != 0, (close - emas) / emas * 100, np.nan)
+    return pd.concat([df, pd.DataFrame(pct, index=df.index, columns=[f'PCT_DIFF_{span}' for span in spans])], axis=1)
+
+def crossover_pairs(spans):
+    """(fast, slow) column pairs watched for crossings: Close over each EMA, and each EMA over the next slower one."""
+    emas = [f'EMA_{span}' for span in sorted(spans)]
+    return [('Close', ema) for ema in emas] + list(zip(emas, emas[1:]))
+
+def detect_crossovers(df, pairs):
+    """Returns every bar where a pair's fast column crossed its slow column, in date order; direction is where fast ended up."""
+    columns = ['Date', 'fast', 'slow', 'direction', 'close', 'bars_ago']
+    if df.empty or not pairs:
+        return pd.DataFrame(columns=columns)
+
+    fast = df[[f for f, _ in pairs]].to_numpy(dtype=float)
+    slow = df[[s for _, s in pairs]].to_numpy(dtype=float)
+    sign = np.nan_to_num(np.sign(fast - slow))
+
+    # Carry the last non-zero side forward over ties and gaps (so a tie dates the cross to the bar after it), then compare bars
+    n_rows = len(sign)
+    last_side = np.where(sign != 0, np.arange(n_rows)[:, None], 0)
+    np.maximum.accumulate(last_side, axis=0, out=last_side)
+    side = np.take_along_axis(sign, last_side, axis=0)
+    crossed = (sign[1:] != 0) & (side[:-1] != 0) & (sign[1:] != side[:-1])
+
+    rows, cols = np.nonzero(crossed)
+    rows += 1
+    order = np.lexsort((cols, rows))
+    rows, cols = rows[order], cols[order]
+
+    return pd.DataFrame({
+        'Date': df.index[rows],
+        'fast': np.array([f for f, _ in pairs], dtype=object)[cols],
+        'slow': np.array([s for _, s in pairs], dtype=object)[cols],
+        'direction': np.where(sign[rows, cols] > 0, "Above", "Below"),
+        'close': df['Close'].to_numpy(dtype=float)[rows],
+        'bars_ago': n_rows - 1 - rows
+    }, columns=columns)
+
+def ticker_crossovers(daily_df, weekly_df, monthly_df):
+    """Returns {timeframe: crossover events} for analyzed daily/weekly/monthly frames."""
+    frames = {"daily": daily_df, "weekly": weekly_df, "monthly": monthly_df}
+    return {tf: detect_crossovers(df, crossover_pairs(SPANS[tf])) for tf, df in frames.items()}
+
+def analyze_ticker(ticker, daily_df, weekly_df, monthly_df, incremental=False):
+    """
+    Orchestrates analysis for all timeframes.
+    With `incremental`, EMAs are advanced from the persisted per-ticker state instead of recomputed.
+    """
     
     # Define spans
-    daily_spans = [9, 21, 50]
-    weekly_spans = [9, 21, 50]
-    monthly_spans = [9, 21]
+    daily_spans = SPANS["daily"]
+    weekly_spans = SPANS["weekly"]
+    monthly_spans = SPANS["monthly"]
     
     # Calculate EMAs
-    daily_df = calculate_emas(daily_df, daily_spans)
-    weekly_df = calculate_emas(weekly_df, weekly_spans)
-    monthly_df = calculate_emas(monthly_df, monthly_spans)
+    if incremental:
+        daily_df = update_emas(ticker, "1d", daily_df, daily_spans)
+        weekly_df = update_emas(ticker, "1wk", weekly_df, weekly_spans)
+        monthly_df = update_emas(ticker, "1mo", monthly_df, monthly_spans)
+    else:
+        daily_df = calculate_emas(daily_df, daily_spans)
+        weekly_df = calculate_emas(weekly_df, weekly_spans)
+        monthly_df = calculate_emas(monthly_df, monthly_spans)
     
+    # Remaining indicators (RSI, MACD, ...) reuse the EMA columns computed above
+    daily_df = add_indicators(daily_df, INDICATORS["daily"])
+    weekly_df = add_indicators(weekly_df, INDICATORS["weekly"])
+    monthly_df = add_indicators(monthly_df, INDICATORS["monthly"])
+
+    # Full history of the Close/EMA distance, stored with the bars
+    daily_df = calculate_diff_series(daily_df, daily_spans)
+    weekly_df = calculate_diff_series(weekly_df, weekly_spans)
+    monthly_df = calculate_diff_series(monthly_df, monthly_spans)
+
     # Calculate Diffs
     daily_diffs = calculate_diffs(daily_df, daily_spans)
     weekly_diffs = calculate_diffs(weekly_df, weekly_spans)
@@ -56,7 +208,47 @@ def analyze_ticker(ticker, daily_df, weekly_df, monthly_df):
     analysis = {
         "daily": daily_diffs,
         "weekly": weekly_diffs,
-        "monthly": monthly_diffs
+        "monthly": monthly_diffs,
+        "indicators": {
+            "daily": latest_values(daily_df, INDICATORS["daily"]),
+            "weekly": latest_values(weekly_df, INDICATORS["weekly"]),
+            "monthly": latest_values(monthly_df, INDICATORS["monthly"])
+        }
     }
     
     return daily_df, weekly_df, monthly_df, analysis
+
+def analyze_panels(panels):
+    """
+    Analyzes a whole universe at once from fetch_many panels ({interval: panel}).
+    Returns {ticker: analysis} in the same shape as analyze_ticker's analysis dict.
+    """
+    results = {}
+    for interval, panel in panels.items():
+        tf = INTERVAL_TIMEFRAMES[interval]
+        if panel.empty:
+            continue
+
+        spans = SPANS[tf]
+        emas = ema_panel(panel, spans)
+
+        latest_close = panel["Close"].groupby(level="Ticker").tail(1).droplevel("Date")
+        latest_ema = emas.groupby(level="Ticker").tail(1).droplevel("Date")
+        latest_close = latest_close.reindex(latest_ema.index)
+        pct = latest_ema.rsub(latest_close, axis=0).div(latest_ema).mul(100)
+
+        for ticker in latest_ema.index:
+            diffs = {}
+            for span in spans:
+                key = f'EMA_{span}'
+                ema_val = latest_ema.at[ticker, key]
+                if pd.notna(ema_val) and ema_val != 0:
+                    pct_diff = float(pct.at[ticker, key])
+                    diffs[key] = {
+                        "value": float(ema_val),
+                        "pct_diff": pct_diff,
+                        "status": "Above" if pct_diff > 0 else "Below"
+                    }
+            results.setdefault(ticker, {"daily": {}, "weekly": {}, "monthly": {}})[tf] = diffs
+
+    return results
@@ -0,0 +1,32 @@
+import os
+import stat
+
+NEW_FILE_MODE = 0o666 # requested for new files; the kernel applies the umask, as it does for open()
+
+def atomic_write(path, content):
+    """
+    Writes content via a temp file in the same directory plus rename, so readers never see torn files.
+    The file keeps its previous permissions (new files get the usual umask-based ones).
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None
+
+    # Created with an explicit mode rather than mkstemp's 0600, which would hide outputs from other users
+    tmp_path = os.path.join(directory, f".tmp-{os.getpid()}-{os.urandom(6).hex()}")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, NEW_FILE_MODE)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        if mode is not None:
+            os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
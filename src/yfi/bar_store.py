@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import pickle
+import numpy as np
+import pandas as pd
+from ..config import BARS_DIR
+from .atomic import atomic_write
+from .columnar import write_version, read_version, META_FILE
+
+def _bar_paths(ticker, interval):
+    """Returns the (bars directory, meta file) paths for a ticker/interval pair."""
+    ticker_dir = os.path.join(BARS_DIR, ticker)
+    return (os.path.join(ticker_dir, interval),
+            os.path.join(ticker_dir, f"{interval}.json"))
+
+def load_bars(ticker, interval, columns=None):
+    """
+    Loads stored bars for a ticker/interval (only `columns`, if given) from the columnar store.
+    Column data is memory-mapped and read-only. Returns an empty DataFrame if none are stored.
+    """
+    bars_dir, _ = _bar_paths(ticker, interval)
+    try:
+        return read_version(bars_dir, columns)
+    except Exception as e:
+        print(f"Error loading stored bars for {ticker} ({interval}): {e}")
+        return pd.DataFrame()
+
+def load_meta(ticker, interval):
+    """Loads the bookkeeping record (last timestamp, period, fetch time) for stored bars."""
+    _, meta_path = _bar_paths(ticker, interval)
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_bars(ticker, interval, df, period=None):
+    """Persists bars (as a new columnar version) and their metadata. Files are replaced atomically."""
+    if df.empty:
+        return
+
+    bars_dir, meta_path = _bar_paths(ticker, interval)
+    atomic_write(os.path.join(bars_dir, META_FILE), write_version(bars_dir, df))
+
+    meta = {
+        "last_ts": df.index[-1].isoformat(),
+        "rows": len(df),
+        "period": period,
+        "fetched_at": time.time()
+    }
+    atomic_write(meta_path, json.dumps(meta, indent=2))
+
+def merge_bars(stored, fresh):
+    """Merges freshly fetched bars into stored ones. Overlapping timestamps take the fresh values."""
+    if stored.empty:
+        return fresh
+    if fresh.empty:
+        return stored
+
+    merged = pd.concat([stored, fresh])
+    merged = merged[~merged.index.duplicated(keep="last")]
+    return merged.sort_index()
+
+def history_revised(stored, fresh, rtol=1e-6):
+    """
+    Returns True if a completed bar present in both frames has a different close,
+    which means the provider re-adjusted history (split, dividend, correction).
+    The last overlapping bar is ignored since it may still be forming.
+    """
+    overlap = stored.index.intersection(fresh.index)
+    if len(overlap) < 2:
+        return False
+
+    completed = overlap[:-1]
+    old = stored.loc[completed, "Close"].to_numpy(dtype=float)
+    new = fresh.loc[completed, "Close"].to_numpy(dtype=float)
+    return not np.allclose(old, new, rtol=rtol, equal_nan=True)
+
+def _ema_state_path(ticker, interval):
+    """Returns the EMA state file path, stored next to the bars for the same interval."""
+    return os.path.join(BARS_DIR, ticker, f"{interval}.ema.pkl")
+
+def load_ema_state(ticker, interval):
+    """Loads persisted EMA state (Close plus EMA_<span> columns). Empty if none is stored."""
+    try:
+        return pd.read_pickle(_ema_state_path(ticker, interval))
+    except (FileNotFoundError, EOFError):
+        return pd.DataFrame()
+    except Exception as e:
+        print(f"Error loading EMA state for {ticker} ({interval}): {e}")
+        return pd.DataFrame()
+
+def save_ema_state(ticker, interval, state):
+    """Persists EMA state. The file is replaced atomically."""
+    if state.empty:
+        return
+    atomic_write(_ema_state_path(ticker, interval), pickle.dumps(state))
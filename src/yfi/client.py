@@ -1,26 +1,148 @@
+import time
 import yfinance as yf
 import pandas as pd
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from .bar_store import load_bars, load_meta, save_bars, merge_bars, history_revised
+from .resample import to_weekly, to_monthly
+from .window import window, canonical_period
 
-def fetch_data(ticker, period="2y", interval="1d"):
-    """Fetches stock history from yfinance."""
+# Stored bars refreshed within this many seconds (e.g. by the precompute job) are served without a provider call
+REFRESH_INTERVAL = 900
+
+def fetch_data(ticker, period="2y", interval="1d", start=None):
+    """Fetches stock history from yfinance. If `start` is given, fetches bars from that date on."""
     try:
         stock = yf.Ticker(ticker)
-        hist = stock.history(period=period, interval=interval)
+        if start is not None:
+            hist = stock.history(start=start, interval=interval)
+        else:
+            hist = stock.history(period=period, interval=interval)
         return hist
     except Exception as e:
         print(f"Error fetching data for {ticker} ({interval}): {e}")
         return pd.DataFrame()
 
-def fetch_all_timeframes(ticker):
-    """Fetches Daily, Weekly, and Monthly data."""
+def fetch_incremental(ticker, period="2y", interval="1d"):
+    """
+    Fetches stock history through the local bar store.
+    Only bars after the last stored timestamp are requested from yfinance;
+    the full period is downloaded on first use or when history was revised.
+    Bars refreshed within REFRESH_INTERVAL are returned without any request.
+    """
+    stored = load_bars(ticker, interval)
+    meta = load_meta(ticker, interval)
+
+    # Refreshed recently (e.g. by the precompute job): serve as is
+    fresh_enough = time.time() - meta.get("fetched_at", 0) < REFRESH_INTERVAL
+    if len(stored) >= 2 and meta.get("period") == period and fresh_enough:
+        return stored
+
+    # Nothing usable stored (or stored for a different period): full download
+    if len(stored) < 2 or meta.get("period") != period:
+        hist = fetch_data(ticker, period=period, interval=interval)
+        save_bars(ticker, interval, hist, period)
+        return hist
+
+    # Re-request from the second-to-last stored bar: the last one may still be forming,
+    # and the completed bar before it tells us whether history was re-adjusted.
+    fresh = fetch_data(ticker, interval=interval, start=stored.index[-2])
+    if fresh.empty:
+        return stored
+
+    if history_revised(stored, fresh):
+        hist = fetch_data(ticker, period=period, interval=interval)
+        if hist.empty:
+            return stored
+        save_bars(ticker, interval, hist, period)
+        return hist
+
+    merged = merge_bars(stored, fresh)
+    # Bars that slid out of the requested period are dropped, so the store does not grow without bound
+    if canonical_period(period):
+        merged = window(merged, period)
+    save_bars(ticker, interval, merged, period)
+    return merged
+
+def trim_to_period(df, years):
+    """Keeps only the trailing `years` of bars."""
+    if df.empty:
+        return df
+    cutoff = df.index[-1] - pd.DateOffset(years=years)
+    return df[df.index >= cutoff]
+
+# How each interval is built from the full daily history: 2y daily, 5y weekly, max monthly
+# (the same windows as the provider fetches in fetch_all_timeframes)
+FROM_DAILY = {
+    "1d": lambda history: trim_to_period(history, 2),
+    "1wk": lambda history: trim_to_period(to_weekly(history), 5),
+    "1mo": to_monthly
+}
+INTERVALS = list(FROM_DAILY)
+
+def fetch_timeframes(ticker, intervals=INTERVALS):
+    """Fetches the full daily history once and builds only the requested intervals from it. Returns {interval: bars}."""
+    history = fetch_incremental(ticker, period="max", interval="1d")
+    return {interval: FROM_DAILY[interval](history) for interval in intervals}
+
+def fetch_all_timeframes(ticker, resample=True):
+    """
+    Fetches Daily, Weekly, and Monthly data.
+    With `resample`, weekly and monthly bars are built locally from the full daily
+    history, so only one yfinance call is made per ticker.
+    """
+    if resample:
+        frames = fetch_timeframes(ticker)
+        return frames["1d"], frames["1wk"], frames["1mo"]
+
     # Daily: 2 years to get enough data for 50 EMA
-    daily = fetch_data(ticker, period="2y", interval="1d")
-    
+    daily = fetch_incremental(ticker, period="2y", interval="1d")
+
     # Weekly: 5 years
-    weekly = fetch_data(ticker, period="5y", interval="1wk")
-    
+    weekly = fetch_incremental(ticker, period="5y", interval="1wk")
+
     # Monthly: Max to ensure enough data points
-    monthly = fetch_data(ticker, period="max", interval="1mo")
-    
+    monthly = fetch_incremental(ticker, period="max", interval="1mo")
+
     return daily, weekly, monthly
+
+def fetch_many(tickers, intervals=INTERVALS, max_workers=8):
+    """
+    Fetches several tickers concurrently on a bounded thread pool, building only the
+    requested intervals. Returns ({interval: panel}, {ticker: error}) where each panel is
+    indexed by (Ticker, Date). A failing ticker is reported in the errors dict and never
+    aborts the batch; an unknown interval raises ValueError before anything is fetched.
+    """
+    intervals = list(intervals)
+    unknown = [interval for interval in intervals if interval not in FROM_DAILY]
+    if unknown:
+        raise ValueError(f"Unknown intervals: {', '.join(unknown)} (expected some of {', '.join(INTERVALS)})")
+
+    tickers = list(dict.fromkeys(t.upper() for t in tickers))
+    frames = {interval: {} for interval in intervals}
+    errors = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {ticker: pool.submit(fetch_timeframes, ticker, intervals) for ticker in tickers}
+        for ticker, future in futures.items():
+            try:
+                by_interval = future.result()
+            except Exception as e:
+                errors[ticker] = str(e)
+                continue
+
+            if all(df.empty for df in by_interval.values()):
+                errors[ticker] = "No data returned"
+                continue
+
+            for interval, df in by_interval.items():
+                frames[interval][ticker] = df
+
+    panels = {}
+    for interval, by_ticker in frames.items():
+        if by_ticker:
+            panels[interval] = pd.concat(by_ticker, names=["Ticker", "Date"])
+        else:
+            panels[interval] = pd.DataFrame()
+
+    return panels, errors
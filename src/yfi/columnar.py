@@ -0,0 +1,178 @@
+"""
+Columnar, memory-mapped bar storage: the pipeline's output under
+output/<TICKER>/columnar/<timeframe>/, and the bar store (yfi.bar_store).
+
+Each save writes one .npy file per column plus the index (as UTC datetime64) into a
+version directory named after a hash of the contents, then points meta.json at it.
+Readers memory-map only the columns they ask for and slice them to the requested date
+range by binary search on the index, so loading a history is a few page faults rather
+than a CSV parse. Unchanged frames are not rewritten.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from ..config import OUTPUT_DIR
+from .window import window_start
+
+META_FILE = "meta.json"
+INDEX_FILE = "index.npy"
+VERSION_GRACE = 60 # seconds; a newer version may be written but not yet referenced by meta.json
+
+def columnar_dir(ticker, timeframe):
+    return os.path.join(OUTPUT_DIR, ticker, "columnar", timeframe)
+
+def _utc_values(index):
+    """Index as naive UTC datetime64 values."""
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.to_numpy()
+
+def _column_file(i):
+    return f"c{i:02d}.npy"
+
+def render_columnar(ticker, timeframe, df):
+    """Writes a ticker's bars for one timeframe to the output store; returns the meta.json content."""
+    return write_version(columnar_dir(ticker, timeframe), df)
+
+def write_version(directory, df):
+    """
+    Writes df's column files into a content-addressed version directory under `directory`
+    (if not already there) and returns the meta.json content pointing at it.
+    Non-numeric columns are skipped.
+    """
+    columns = [c for c in df.columns if np.issubdtype(df[c].dtype, np.number) or df[c].dtype == bool]
+    arrays = [_utc_values(df.index)] + [np.ascontiguousarray(df[c].to_numpy()) for c in columns]
+
+    digest = hashlib.sha1()
+    for name, arr in zip(["__index__"] + columns, arrays):
+        digest.update(f"{name}:{arr.dtype.str}:{arr.shape}".encode())
+        digest.update(arr.tobytes())
+    version = digest.hexdigest()[:16]
+
+    version_dir = os.path.join(directory, version)
+    if not os.path.isdir(version_dir):
+        tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, INDEX_FILE), arrays[0])
+        for i, arr in enumerate(arrays[1:]):
+            np.save(os.path.join(tmp_dir, _column_file(i)), arr)
+        try:
+            os.replace(tmp_dir, version_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True) # another writer got there first
+    else:
+        # Reused: restart its grace period so a concurrent cleanup does not take it
+        os.utime(version_dir)
+
+    _remove_old_versions(directory, keep={version, _current_version(directory)})
+
+    meta = {
+        "version": version,
+        "rows": len(df),
+        "tz": str(df.index.tz) if df.index.tz is not None else None,
+        "index_name": df.index.name,
+        "columns": [{"name": c, "file": _column_file(i), "dtype": str(df[c].dtype)} for i, c in enumerate(columns)]
+    }
+    return json.dumps(meta, indent=2)
+
+def _current_version(directory):
+    meta = _read_meta(directory)
+    return meta["version"] if meta else None
+
+def _remove_old_versions(directory, keep):
+    """
+    Deletes version directories other than `keep` that are older than VERSION_GRACE, so a
+    version another process has just written, but not yet pointed meta.json at, survives.
+    Open memory maps stay valid after deletion.
+    """
+    try:
+        entries = os.listdir(directory)
+    except FileNotFoundError:
+        return
+    cutoff = time.time() - VERSION_GRACE
+    for entry in entries:
+        path = os.path.join(directory, entry)
+        if entry in keep or ".tmp-" in entry or not os.path.isdir(path):
+            continue
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except FileNotFoundError:
+            continue # removed by another writer
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def _to_utc64(ts, tz, unit):
+    ts = pd.Timestamp(ts)
+    if tz is not None:
+        ts = ts.tz_localize(tz) if ts.tz is None else ts
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    elif ts.tz is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return np.datetime64(ts.to_datetime64(), unit)
+
+def _read_version(directory, meta, columns, start, end, period):
+    version_dir = os.path.join(directory, meta["version"])
+    index = np.load(os.path.join(version_dir, INDEX_FILE), mmap_mode="r")
+    unit = np.datetime_data(index.dtype)[0]
+
+    lo, hi = 0, len(index)
+    if start is not None:
+        lo = int(np.searchsorted(index, _to_utc64(start, meta["tz"], unit), side="left"))
+    if period is not None and hi:
+        last = pd.DatetimeIndex(index[-1:]).tz_localize("UTC")
+        first = window_start(last.tz_convert(meta["tz"]) if meta["tz"] else last.tz_localize(None), period)
+        if first is not None:
+            lo = max(lo, int(np.searchsorted(index, _to_utc64(first, meta["tz"], unit), side="left")))
+    if end is not None:
+        hi = int(np.searchsorted(index, _to_utc64(end, meta["tz"], unit), side="right"))
+
+    wanted = meta["columns"] if columns is None else [c for c in meta["columns"] if c["name"] in columns]
+    data = {c["name"]: np.load(os.path.join(version_dir, c["file"]), mmap_mode="r")[lo:hi] for c in wanted}
+
+    dates = pd.DatetimeIndex(index[lo:hi], name=meta["index_name"])
+    if meta["tz"]:
+        dates = dates.tz_localize("UTC").tz_convert(meta["tz"])
+    # copy=False keeps one block per column backed by the memory map
+    return pd.DataFrame(data, index=dates, copy=False)
+
+def read_columnar(ticker, timeframe, columns=None, start=None, end=None, period=None):
+    """Loads a ticker's bars for one timeframe from the output store (see read_version)."""
+    return read_version(columnar_dir(ticker, timeframe), columns, start, end, period)
+
+def read_version(directory, columns=None, start=None, end=None, period=None):
+    """
+    Loads the bars stored under `directory`.
+    Only `columns` (default: all) are mapped, sliced to [start, end] and/or the trailing
+    `period` (e.g. "1Y", see yfi.window). Column data stays memory-mapped and read-only.
+    Returns an empty DataFrame if nothing is stored.
+    """
+    for _ in range(2):
+        meta = _read_meta(directory)
+        if meta is None:
+            return pd.DataFrame()
+        try:
+            return _read_version(directory, meta, columns, start, end, period)
+        except FileNotFoundError:
+            continue # a newer version replaced this one between reading meta and the files
+    return pd.DataFrame()
+
+def export_csv(ticker, timeframe, path=None):
+    """Writes a ticker's stored bars to CSV (default: output/<TICKER>/data_<timeframe>.csv). Returns the path."""
+    df = read_columnar(ticker, timeframe)
+    if df.empty:
+        return None
+    path = path or os.path.join(OUTPUT_DIR, ticker, f"data_{timeframe}.csv")
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    df.to_csv(tmp_path)
+    os.replace(tmp_path, path)
+    return path
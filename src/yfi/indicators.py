@@ -0,0 +1,267 @@
+"""
+Declarative indicator engine.
+
+INDICATORS lists, per timeframe, the indicators to compute as (kind, params) pairs.
+Each indicator is expanded into a graph of intermediate nodes (EMAs, rolling means,
+true range, ...) keyed by what they compute, so indicators that need the same
+intermediate share it (MACD 12/26 reuses EMA_12/EMA_26, Bollinger reuses SMA_20).
+Every recursive smoother (EMAs, Wilder averages for RSI/ATR) that does not depend
+on another one advances in a single shared pass over time, so adding indicators
+adds columns to that pass rather than whole passes.
+"""
+import numpy as np
+import pandas as pd
+
+# Indicators per timeframe; EMA spans here also drive the EMA analysis table
+INDICATORS = {
+    "daily": [
+        ("ema", {"span": 9}), ("ema", {"span": 21}), ("ema", {"span": 50}),
+        ("sma", {"window": 50}), ("sma", {"window": 200}),
+        ("rsi", {"window": 14}),
+        ("macd", {"fast": 12, "slow": 26, "signal": 9}),
+        ("atr", {"window": 14}),
+        ("bollinger", {"window": 20, "k": 2.0}),
+        ("volume_sma", {"window": 20})
+    ],
+    "weekly": [
+        ("ema", {"span": 9}), ("ema", {"span": 21}), ("ema", {"span": 50}),
+        ("rsi", {"window": 14}),
+        ("macd", {"fast": 12, "slow": 26, "signal": 9}),
+        ("atr", {"window": 14}),
+        ("volume_sma", {"window": 10})
+    ],
+    "monthly": [
+        ("ema", {"span": 9}), ("ema", {"span": 21}),
+        ("rsi", {"window": 14}),
+        ("macd", {"fast": 12, "slow": 26, "signal": 9})
+    ]
+}
+
+def ema_spans(specs):
+    """Returns the EMA spans listed in an indicator spec."""
+    return [params["span"] for kind, params in specs if kind == "ema"]
+
+# --- Recursive smoothing ---
+
+def ewm_columns(values, alphas, state=None):
+    """
+    Exponentially smooths each column of a (T, M) matrix with its own alpha.
+    Matches Series.ewm(alpha, adjust=False, ignore_na=True): leading NaNs stay NaN, each
+    column is seeded with its first valid value, and interior NaNs carry the previous value.
+    `state` is an optional (M,) array of values to continue from.
+    """
+    values = np.asarray(values, dtype=float)
+    alphas = np.asarray(alphas, dtype=float)
+    n_rows, n_cols = values.shape
+    if state is not None:
+        # A seed row in front continues from the state: with ignore_na, a NaN seed is simply skipped
+        values = np.vstack([np.asarray(state, dtype=float).reshape(1, n_cols), values])
+
+    # Columns sharing an alpha go through pandas' compiled recursion together
+    out = np.empty(values.shape)
+    for alpha in np.unique(alphas):
+        cols = np.flatnonzero(alphas == alpha)
+        frame = pd.DataFrame(values[:, cols])
+        out[:, cols] = frame.ewm(alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+    return out if state is None else out[1:]
+
+def rolling_mean(x, window):
+    """Trailing mean over `window` bars; the first window-1 values are NaN."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window).mean(axis=1)
+    return out
+
+def rolling_std(x, window):
+    """Trailing population standard deviation over `window` bars."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(x, window).std(axis=1)
+    return out
+
+# --- Graph building ---
+# Nodes are tuples (op, *args); args that are tuples are input nodes.
+
+def _col(name):
+    return ("col", name)
+
+def _ema(source, span):
+    return ("ewm", source, 2.0 / (span + 1.0), ("ema", span))
+
+def _wilder(source, window):
+    return ("ewm", source, 1.0 / window, ("wilder", window))
+
+def _build_ema(span):
+    return {f"EMA_{span}": _ema(_col("Close"), span)}
+
+def _build_sma(window):
+    return {f"SMA_{window}": ("sma", _col("Close"), window)}
+
+def _build_rsi(window=14):
+    gain = ("gain", _col("Close"))
+    loss = ("loss", _col("Close"))
+    return {f"RSI_{window}": ("rsi", _wilder(gain, window), _wilder(loss, window))}
+
+def _build_macd(fast=12, slow=26, signal=9):
+    line = ("sub", _ema(_col("Close"), fast), _ema(_col("Close"), slow))
+    sig = _ema(line, signal)
+    return {
+        f"MACD_{fast}_{slow}": line,
+        f"MACD_SIGNAL_{fast}_{slow}_{signal}": sig,
+        f"MACD_HIST_{fast}_{slow}_{signal}": ("sub", line, sig)
+    }
+
+def _build_atr(window=14):
+    return {f"ATR_{window}": _wilder(("true_range",), window)}
+
+def _build_bollinger(window=20, k=2.0):
+    mid = ("sma", _col("Close"), window)
+    band = ("scale", ("std", _col("Close"), window), k)
+    return {
+        f"BB_MID_{window}": mid,
+        f"BB_UPPER_{window}": ("add", mid, band),
+        f"BB_LOWER_{window}": ("sub", mid, band)
+    }
+
+def _build_volume_sma(window=20):
+    return {f"VOL_SMA_{window}": ("sma", _col("Volume"), window)}
+
+BUILDERS = {
+    "ema": _build_ema,
+    "sma": _build_sma,
+    "rsi": _build_rsi,
+    "macd": _build_macd,
+    "atr": _build_atr,
+    "bollinger": _build_bollinger,
+    "volume_sma": _build_volume_sma
+}
+
+def build_outputs(specs):
+    """Expands a spec list into {output column: node}."""
+    outputs = {}
+    for kind, params in specs:
+        if kind not in BUILDERS:
+            raise ValueError(f"Unknown indicator: {kind}")
+        outputs.update(BUILDERS[kind](**params))
+    return outputs
+
+def _inputs(node):
+    return [arg for arg in node[1:] if isinstance(arg, tuple) and (arg[0] in OPS or arg[0] == "ewm")]
+
+def _stages(outputs):
+    """
+    Returns {node: stage}, where a node's stage is the number of smoothing passes that
+    must run before it can be computed (a smoother sits one stage above its input).
+    Smoothers with the same stage are independent and can share a pass.
+    """
+    stages = {}
+
+    def visit(node):
+        if node not in stages:
+            stage = max((visit(n) for n in _inputs(node)), default=0)
+            stages[node] = stage + 1 if node[0] == "ewm" else stage
+        return stages[node]
+
+    for node in outputs.values():
+        visit(node)
+    return stages
+
+# --- Evaluation ---
+
+def _true_range(df):
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    prev_close = np.roll(df["Close"].to_numpy(dtype=float), 1)
+    prev_close[0] = np.nan
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+def _change(x, sign):
+    change = np.diff(x, prepend=np.nan)
+    return np.clip(sign * change, 0, None)
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+
+OPS = {
+    "col": lambda df, v, name: df[name].to_numpy(dtype=float),
+    "true_range": lambda df, v: _true_range(df),
+    "gain": lambda df, v, src: _change(v[src], 1),
+    "loss": lambda df, v, src: _change(v[src], -1),
+    "sma": lambda df, v, src, window: rolling_mean(v[src], window),
+    "std": lambda df, v, src, window: rolling_std(v[src], window),
+    "sub": lambda df, v, a, b: v[a] - v[b],
+    "add": lambda df, v, a, b: v[a] + v[b],
+    "scale": lambda df, v, src, k: v[src] * k,
+    "rsi": lambda df, v, gain, loss: _rsi(v[gain], v[loss])
+}
+
+def _reusable_column(df, node):
+    """Returns an existing EMA_<span> column of df that already holds this node's values, if any."""
+    if node[0] == "ewm" and node[1] == _col("Close") and node[3][0] == "ema":
+        name = f"EMA_{node[3][1]}"
+        if name in df.columns:
+            return df[name].to_numpy(dtype=float)
+    return None
+
+def evaluate(df, specs):
+    """
+    Computes every indicator in `specs` for an OHLCV frame.
+    EMA_<span> columns already on df (e.g. from the incremental EMA state) are reused.
+    Returns {output column: numpy array} aligned with df.index.
+    """
+    outputs = build_outputs(specs)
+    if df.empty:
+        return {name: np.array([]) for name in outputs}
+
+    stages = _stages(outputs)
+    values = {}
+
+    def compute(node):
+        # Smoothers are filled in by their pass below; everything else is computed on demand
+        if node not in values:
+            for n in _inputs(node):
+                compute(n)
+            values[node] = OPS[node[0]](df, values, *node[1:])
+        return values[node]
+
+    for stage in range(1, max(stages.values()) + 1):
+        smoothers = []
+        for node, s in stages.items():
+            if s != stage or node[0] != "ewm":
+                continue
+            existing = _reusable_column(df, node)
+            if existing is not None:
+                values[node] = existing
+            else:
+                smoothers.append(node)
+
+        # All smoothers of a stage advance together in one pass over time
+        if smoothers:
+            matrix = np.column_stack([compute(node[1]) for node in smoothers])
+            smoothed = ewm_columns(matrix, [node[2] for node in smoothers])
+            for i, node in enumerate(smoothers):
+                values[node] = smoothed[:, i]
+
+    return {name: compute(node) for name, node in outputs.items()}
+
+def add_indicators(df, specs):
+    """Returns df with every indicator in `specs` added as a column."""
+    if df.empty:
+        return df
+    columns = {name: col for name, col in evaluate(df, specs).items() if name not in df.columns}
+    # One concat instead of a column-by-column assign
+    return pd.concat([df, pd.DataFrame(columns, index=df.index)], axis=1)
+
+def latest_values(df, specs):
+    """Returns {indicator column: latest value} for the spec's columns present on df (NaN values are skipped)."""
+    if df.empty:
+        return {}
+    latest = df.iloc[-1]
+    values = {}
+    for name in build_outputs(specs):
+        value = latest.get(name)
+        if value is not None and pd.notna(value):
+            values[name] = float(value)
+    return values
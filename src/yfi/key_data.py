@@ -0,0 +1,85 @@
+import yfinance as yf
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+
+# Fields shown in the Key Data panel, named as in yfinance's .info
+KEY_FIELDS = ["open", "dayLow", "dayHigh", "fiftyTwoWeekLow", "fiftyTwoWeekHigh",
+              "marketCap", "beta", "dividendRate", "dividendYield"]
+
+# Quote fields available from the lightweight fast_info endpoint (attribute -> .info name)
+FAST_FIELDS = {
+    "open": "open",
+    "day_low": "dayLow",
+    "day_high": "dayHigh",
+    "year_low": "fiftyTwoWeekLow",
+    "year_high": "fiftyTwoWeekHigh",
+    "market_cap": "marketCap"
+}
+
+# Fields only .info provides; they change slowly, so they are cached much longer
+PROFILE_FIELDS = ["beta", "dividendRate", "dividendYield"]
+
+QUOTE_TTL = 300 # 5 minutes
+PROFILE_TTL = 24 * 3600 # 1 day
+MAX_ENTRIES = 256
+
+@st.cache_data(ttl=QUOTE_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def _fetch_quote_fields(ticker):
+    """Fetches the price-driven key data fields from fast_info."""
+    fast = yf.Ticker(ticker).fast_info
+    snapshot = {}
+    for attr, field in FAST_FIELDS.items():
+        try:
+            snapshot[field] = getattr(fast, attr)
+        except Exception:
+            snapshot[field] = None
+    return snapshot
+
+@st.cache_data(ttl=PROFILE_TTL, max_entries=MAX_ENTRIES, show_spinner=False)
+def _fetch_info_fields(ticker, fields):
+    """Fetches the given fields from the (slow) .info endpoint."""
+    info = yf.Ticker(ticker).info
+    return {field: info.get(field) for field in fields}
+
+def get_quote_data(ticker):
+    """Returns the fast_info quote fields of KEY_FIELDS, or None if the ticker could not be fetched."""
+    try:
+        return dict(_fetch_quote_fields(ticker))
+    except Exception as e:
+        print(f"Error fetching quote data for {ticker}: {e}")
+        return None
+
+def get_profile_data(ticker):
+    """Returns the PROFILE_FIELDS (beta, dividend) from .info, or None if they could not be fetched."""
+    try:
+        return dict(_fetch_info_fields(ticker, tuple(PROFILE_FIELDS)))
+    except Exception as e:
+        print(f"Error fetching profile data for {ticker}: {e}")
+        return None
+
+def get_key_data(ticker, use_fast_info=True):
+    """
+    Returns a snapshot dict with only the KEY_FIELDS the Key Data panel shows.
+    With `use_fast_info`, quote fields come from fast_info (5 min TTL) and only
+    beta/dividend hit .info (1 day TTL); otherwise everything comes from .info.
+    The dashboard loads the two halves separately (get_quote_data, get_profile_data),
+    so the slow .info call never holds up the quote.
+    Returns None if the ticker could not be fetched.
+    """
+    try:
+        if use_fast_info:
+            snapshot = dict(_fetch_quote_fields(ticker))
+            snapshot.update(_fetch_info_fields(ticker, tuple(PROFILE_FIELDS)))
+        else:
+            snapshot = dict(_fetch_info_fields(ticker, tuple(KEY_FIELDS)))
+        return snapshot
+    except Exception as e:
+        print(f"Error fetching key data for {ticker}: {e}")
+        return None
+
+def prefetch_key_data(tickers, max_workers=8, use_fast_info=True):
+    """Warms the key data cache for several tickers concurrently. Returns {ticker: snapshot}."""
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        snapshots = pool.map(lambda t: get_key_data(t, use_fast_info), tickers)
+        return dict(zip(tickers, snapshots))
@@ -0,0 +1,37 @@
+# yfinance labels weekly bars with the Monday that opens the week
+# and monthly bars with the first calendar day of the month.
+WEEKLY_RULE = "W-MON"
+MONTHLY_RULE = "MS"
+
+def resample_ohlcv(df, rule):
+    """Aggregates OHLCV bars to a coarser frequency. Periods without trading are dropped."""
+    if df.empty:
+        return df
+
+    agg = {
+        "Open": "first",
+        "High": "max",
+        "Low": "min",
+        "Close": "last",
+        "Volume": "sum",
+    }
+    for col in ["Dividends", "Capital Gains"]:
+        if col in df.columns:
+            agg[col] = "sum"
+
+    resampled = df.resample(rule, label="left", closed="left").agg(agg)
+    if "Stock Splits" in df.columns:
+        # Split ratios within a period multiply; yfinance uses 0 for "no split"
+        ratios = df["Stock Splits"].replace(0, 1).resample(rule, label="left", closed="left").prod()
+        resampled["Stock Splits"] = ratios.replace(1, 0)
+
+    resampled = resampled.dropna(subset=["Close"])
+    return resampled[[c for c in df.columns if c in resampled.columns]]
+
+def to_weekly(daily_df):
+    """Builds weekly bars (Monday-anchored) from daily bars."""
+    return resample_ohlcv(daily_df, WEEKLY_RULE)
+
+def to_monthly(daily_df):
+    """Builds monthly bars (month-start anchored) from daily bars."""
+    return resample_ohlcv(daily_df, MONTHLY_RULE)
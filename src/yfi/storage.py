@@ -1,25 +1,143 @@
 import os
 import json
+import atexit
+import hashlib
+import threading
+import pandas as pd
 from ..config import OUTPUT_DIR
+from ..tracing import span, traced
+from .atomic import atomic_write
+from .columnar import render_columnar, columnar_dir, META_FILE
+
+EVENTS_FILE = "events.json" # crossover events, next to each timeframe's columnar bars
+
+# --- Write-behind queue ---
+# Jobs are queued as {key: job} and run by a single background thread. For writes the
+# key is the path: queuing the same path again before it is written replaces the pending
+# render, so a burst of reruns results in one write of the latest content.
+_pending = {}
+_written_hashes = {} # path -> sha1 of the content last written (or found on disk)
+_in_flight = 0
+_cond = threading.Condition()
+_worker = None
+
+def _file_hash(path):
+    """Returns the sha1 of a file on disk, or None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def write_if_changed(path, content):
+    """Writes content unless the file already holds identical bytes. Returns True if written."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    digest = hashlib.sha1(content).hexdigest()
+    if path not in _written_hashes:
+        _written_hashes[path] = _file_hash(path)
+    if _written_hashes[path] == digest:
+        return False
+
+    atomic_write(path, content)
+    _written_hashes[path] = digest
+    return True
+
+def _run_writer():
+    """Background loop draining the write-behind queue."""
+    global _in_flight
+    while True:
+        with _cond:
+            while not _pending:
+                _cond.wait()
+            key = next(iter(_pending))
+            job = _pending.pop(key)
+            _in_flight += 1
+
+        try:
+            job()
+        except Exception as e:
+            print(f"Error writing {key}: {e}")
+        finally:
+            with _cond:
+                _in_flight -= 1
+                _cond.notify_all()
+
+def run_behind(key, job):
+    """
+    Queues job() on the write-behind thread without blocking the caller. A job queued
+    under a key that is still pending replaces it, so the job should do all work due by
+    the time it runs (e.g. drain a buffer) rather than one caller's share.
+    """
+    global _worker
+    with _cond:
+        _pending[key] = job
+        if _worker is None:
+            _worker = threading.Thread(target=_run_writer, name="write-behind", daemon=True)
+            _worker.start()
+        _cond.notify_all()
+
+def write_behind(path, render):
+    """
+    Queues a write of render() to path without blocking the caller.
+    `render` is called on the writer thread, so serialization cost is also off the render path.
+    """
+    def job():
+        with span("storage.write", file=os.path.basename(path)) as s:
+            s["changed"] = write_if_changed(path, render())
+
+    run_behind(path, job)
+
+def flush(timeout=None):
+    """Blocks until all queued writes are on disk. Returns False if the timeout expired first."""
+    with _cond:
+        return _cond.wait_for(lambda: not _pending and _in_flight == 0, timeout)
+
+atexit.register(flush)
 
 def save_dataframes(ticker, daily_df, weekly_df, monthly_df):
-    """Saves Daily, Weekly, and Monthly dataframes to CSV."""
-    ticker_dir = os.path.join(OUTPUT_DIR, ticker)
-    os.makedirs(ticker_dir, exist_ok=True)
-    
-    if not daily_df.empty:
-        daily_df.to_csv(os.path.join(ticker_dir, "data_daily.csv"))
-        
-    if not weekly_df.empty:
-        weekly_df.to_csv(os.path.join(ticker_dir, "data_weekly.csv"))
-        
-    if not monthly_df.empty:
-        monthly_df.to_csv(os.path.join(ticker_dir, "data_monthly.csv"))
+    """
+    Saves Daily, Weekly, and Monthly dataframes to the columnar store (written in the background).
+    Use columnar.export_csv for CSV copies.
+    """
+    frames = {"daily": daily_df, "weekly": weekly_df, "monthly": monthly_df}
+    for timeframe, df in frames.items():
+        if df.empty:
+            continue
+        render = lambda timeframe=timeframe, df=df: render_columnar(ticker, timeframe, df)
+        meta_path = os.path.join(columnar_dir(ticker, timeframe), META_FILE)
+        write_behind(meta_path, traced("storage.columnar", render, ticker=ticker))
 
 def save_analysis(ticker, analysis):
-    """Saves analysis results to JSON."""
+    """Saves analysis results to JSON (written in the background)."""
     ticker_dir = os.path.join(OUTPUT_DIR, ticker)
-    os.makedirs(ticker_dir, exist_ok=True)
-    
-    with open(os.path.join(ticker_dir, "analysis.json"), "w") as f:
-        json.dump(analysis, f, indent=2)
+    write_behind(os.path.join(ticker_dir, "analysis.json"), lambda: json.dumps(analysis, indent=2))
+
+def _render_events(events):
+    if events.empty:
+        # No crossovers; an empty frame may not even have a datetime Date column
+        return "[]"
+    # Wall-clock dates: a UTC offset that changes with DST would not read back as one column
+    dates = events["Date"].dt.tz_localize(None) if events["Date"].dt.tz is not None else events["Date"]
+    records = events.assign(Date=dates.map(lambda d: d.isoformat())).to_dict(orient="records")
+    return json.dumps(records, indent=2, default=int)
+
+def save_events(ticker, events):
+    """Saves {timeframe: crossover events} next to the columnar bars (written in the background)."""
+    for timeframe, df in events.items():
+        path = os.path.join(columnar_dir(ticker, timeframe), EVENTS_FILE)
+        write_behind(path, lambda df=df: _render_events(df))
+
+def load_events(ticker, timeframe):
+    """Reads a ticker's stored crossover events for one timeframe (empty frame if none). Dates are wall-clock times."""
+    path = os.path.join(columnar_dir(ticker, timeframe), EVENTS_FILE)
+    try:
+        with open(path, "r") as f:
+            records = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return pd.DataFrame()
+    events = pd.DataFrame.from_records(records)
+    if not events.empty:
+        events["Date"] = pd.to_datetime(events["Date"])
+    return events
@@ -0,0 +1,79 @@
+import pandas as pd
+
+# Chart windows, as offsets back from the last bar; YTD and MAX are resolved separately
+PERIOD_OFFSETS = {
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "1Y": pd.DateOffset(years=1),
+    "2Y": pd.DateOffset(years=2),
+    "3Y": pd.DateOffset(years=3),
+    "5Y": pd.DateOffset(years=5),
+    "10Y": pd.DateOffset(years=10)
+}
+PERIODS = list(PERIOD_OFFSETS) + ["YTD", "MAX"]
+PERIOD_ALIASES = {"1MO": "1M", "3MO": "3M", "6MO": "6M"} # yfinance spellings
+COVERS_TOLERANCE = pd.Timedelta(days=7) # a window start on a weekend or holiday is covered by the next session
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE_HOUR = 16
+
+def last_completed_bar(now=None):
+    """
+    Returns the date (YYYY-MM-DD) of the most recent completed daily session.
+    Weekends are skipped; exchange holidays are not modeled, which only means
+    the cache key stays the same across a holiday.
+    """
+    now = now or pd.Timestamp.now(tz=MARKET_TZ)
+    session = now.normalize()
+    if now.hour < MARKET_CLOSE_HOUR:
+        session -= pd.Timedelta(days=1)
+    session = pd.offsets.BDay().rollback(session.tz_localize(None))
+    return session.strftime("%Y-%m-%d")
+
+def canonical_period(period):
+    """Returns the PERIODS name of a period ("2y" -> "2Y", "6mo" -> "6M"), or None if it is not one."""
+    period = PERIOD_ALIASES.get(period.upper(), period.upper())
+    return period if period in PERIODS else None
+
+def window_start(index, period):
+    """Returns the first timestamp of the `period` window ending at the index's last bar (None for MAX)."""
+    name = canonical_period(period)
+    if name is None:
+        raise ValueError(f"Unknown period: {period}")
+    end = index[-1]
+    if name == "MAX":
+        return None
+    if name == "YTD":
+        return end.normalize().replace(month=1, day=1)
+    return end - PERIOD_OFFSETS[name]
+
+def window_position(index, period):
+    """Returns the position of the window's first bar, by binary search on the sorted index."""
+    start = window_start(index, period)
+    return 0 if start is None else int(index.searchsorted(start, side="left"))
+
+def window(df, period):
+    """
+    Returns the trailing `period` of df as a positional slice.
+    Under copy-on-write the slice shares df's data until one of them is modified.
+    """
+    if df.empty:
+        return df
+    return df.iloc[window_position(df.index, period):]
+
+def covers(df, period):
+    """
+    True if df reaches back to the start of the window, i.e. no deeper history is needed.
+    Data trimmed to the same period starts at the first session on or after the window
+    start, so a first bar up to COVERS_TOLERANCE later still counts.
+    """
+    if df.empty:
+        return False
+    start = window_start(df.index, period)
+    return start is not None and df.index[0] <= start + COVERS_TOLERANCE
+
+def read_window(ticker, period, interval="1d"):
+    """Reads the trailing `period` of a ticker's stored bars (no provider call)."""
+    # Imported here: the bar store reads through the columnar store, which imports this module
+    from .bar_store import load_bars
+    return window(load_bars(ticker, interval), period)
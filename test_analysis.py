@@ -0,0 +1,89 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from src import config
+from src.yfi import analysis, bar_store
+from bench.fixtures import synthetic_ohlcv
+from src.yfi.analysis import update_emas, calculate_emas
+
+SPANS = [9, 21, 50]
+COLS = [f"EMA_{span}" for span in SPANS]
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Points the bar store (and the EMA state next to it) at tmp_path."""
+    for module in (config, bar_store):
+        monkeypatch.setattr(module, "BARS_DIR", str(tmp_path / "bars"))
+
+@pytest.fixture
+def recomputes(monkeypatch):
+    """Counts full recomputes made by update_emas."""
+    calls = []
+
+    def counting(df, spans):
+        calls.append(len(df))
+        return calculate_emas(df, spans)
+
+    monkeypatch.setattr(analysis, "calculate_emas", counting)
+    return calls
+
+def with_close(df, date, close):
+    """Returns a copy of df with one bar's close replaced."""
+    df = df.copy()
+    df.loc[date, "Close"] = close
+    return df
+
+def test_update_emas_advances_from_the_bar_before_the_last(recomputes):
+    history = synthetic_ohlcv(400, seed=3)
+    # The last bar was still forming when the state was saved, so its close later moves
+    forming = with_close(history.iloc[:300], history.index[299], history["Close"].iloc[299] * 1.05)
+    update_emas("AAA", "1d", forming, SPANS)
+    assert recomputes == [300]
+
+    result = update_emas("AAA", "1d", history, SPANS)
+    assert recomputes == [300]
+    expected = calculate_emas(history[["Close"]], SPANS)
+    assert np.allclose(result[COLS].to_numpy(), expected[COLS].to_numpy())
+
+    state = bar_store.load_ema_state("AAA", "1d")
+    assert state.index[-1] == history.index[-1]
+
+def test_update_emas_recomputes_revised_history(recomputes):
+    history = synthetic_ohlcv(400, seed=4)
+    update_emas("AAA", "1d", history.iloc[:300], SPANS)
+
+    # A split or correction moves the anchor close (state.index[-2]), so the state is stale
+    revised = with_close(history, history.index[298], history["Close"].iloc[298] * 0.5)
+    result = update_emas("AAA", "1d", revised, SPANS)
+    assert recomputes == [300, 400]
+    expected = calculate_emas(revised[["Close"]], SPANS)
+    assert np.allclose(result[COLS].to_numpy(), expected[COLS].to_numpy())
+
+def test_update_emas_recomputes_when_spans_change(recomputes):
+    history = synthetic_ohlcv(300, seed=5)
+    update_emas("AAA", "1d", history, SPANS)
+    result = update_emas("AAA", "1d", history, [9, 200])
+    assert recomputes == [300, 300]
+    assert list(result.columns[-2:]) == ["EMA_9", "EMA_200"]
+
+def test_update_emas_tail_matches_a_sliding_window(recomputes):
+    history = synthetic_ohlcv(1200, seed=6)
+    update_emas("AAA", "1d", history.iloc[:800], SPANS)
+
+    # The window slides forward; only its recent tail has to match a recompute over the window alone
+    window = history.iloc[400:]
+    result = update_emas("AAA", "1d", window, SPANS)
+    assert recomputes == [800]
+    expected = calculate_emas(window[["Close"]], SPANS)
+    assert np.allclose(result[COLS].iloc[-250:].to_numpy(), expected[COLS].iloc[-250:].to_numpy())
+    assert bar_store.load_ema_state("AAA", "1d").index[0] == window.index[0]
+
+if __name__ == "__main__":
+    # The checks need the fixtures above, so they run through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
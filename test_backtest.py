@@ -0,0 +1,70 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from src import config, backtest
+from src.yfi import bar_store, columnar, storage
+from bench.fixtures import synthetic_ohlcv
+from src.yfi.bar_store import save_bars
+from src.yfi.client import trim_to_period
+from src.yfi.resample import to_weekly
+from src.yfi.window import window
+from src.yfi.storage import save_dataframes, flush
+from src.backtest import backtest_tickers, backtest_closes, parameter_grid, stored_tickers, BARS_PER_YEAR
+
+TEN_YEARS = 2520 # daily bars
+FAST, SLOW = parameter_grid([1, 21], [50, 200])
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Points the bar store and the output store at tmp_path, including the copies modules took at import."""
+    bars_dir, output_dir = str(tmp_path / "bars"), str(tmp_path / "output")
+    for module in (config, bar_store, backtest):
+        monkeypatch.setattr(module, "BARS_DIR", bars_dir)
+    for module in (config, columnar, storage):
+        monkeypatch.setattr(module, "OUTPUT_DIR", output_dir)
+
+def store_history(ticker):
+    """Stores ten years of daily bars, and the 2y of them the app's pipeline writes to its columnar output."""
+    history = synthetic_ohlcv(TEN_YEARS)
+    save_bars(ticker, "1d", history, period="max")
+    recent = trim_to_period(history, 2)
+    save_dataframes(ticker, recent, recent.iloc[:0], recent.iloc[:0])
+    flush()
+    return history
+
+def test_backtest_uses_full_history():
+    history = store_history("LONG")
+    assert "LONG" in stored_tickers()
+
+    results = backtest_tickers(["LONG"], "daily", FAST, SLOW).loc["LONG"]
+    close = history["Close"].to_numpy()
+    expected = backtest_closes(close, FAST, SLOW)
+
+    # Buy-and-hold spans exactly the closes that were tested
+    assert np.allclose(results["buy_hold_return"], close[-1] / close[0] - 1)
+    assert np.allclose(results["cagr"], expected["cagr"])
+    years = (history.index[-1] - history.index[0]).days / 365.25
+    assert years > 2 and len(close) / BARS_PER_YEAR["daily"] > 2
+
+def test_backtest_period_window():
+    history = store_history("WIN")
+    results = backtest_tickers(["WIN"], "daily", FAST, SLOW, period="5Y").loc["WIN"]
+    close = window(history, "5Y")["Close"].to_numpy()
+    assert len(close) > 2 * BARS_PER_YEAR["daily"]
+    assert np.allclose(results["buy_hold_return"], close[-1] / close[0] - 1)
+
+def test_backtest_resamples_full_history():
+    history = store_history("WEEK")
+    results = backtest_tickers(["WEEK"], "weekly", FAST, SLOW).loc["WEEK"]
+    close = to_weekly(history)["Close"].to_numpy()
+    assert len(close) > 2 * BARS_PER_YEAR["weekly"]
+    assert np.allclose(results["buy_hold_return"], close[-1] / close[0] - 1)
+
+if __name__ == "__main__":
+    # The checks need the isolated_dirs fixture, so they run through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,108 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from src import config, scraper
+from src.yfi import bar_store, client, key_data
+from bench.fixtures import synthetic_ohlcv
+from src.yfi.bar_store import save_bars
+from src.yfi.client import fetch_many, trim_to_period
+from src.yfi.resample import to_weekly
+from src.yfi.window import window, read_window
+from src.yfi.analysis import analyze_panels, analyze_ticker, ema_panel, calculate_emas
+
+# Tickers listed at different times, so panels need aligning
+HISTORIES = {"AAA": synthetic_ohlcv(1500, seed=1), "BBB": synthetic_ohlcv(900, seed=2)}
+
+@pytest.fixture(autouse=True)
+def isolated_dirs(tmp_path, monkeypatch):
+    """Points the bar store and the Zacks cache at tmp_path, including the copies modules took at import."""
+    bars_dir = str(tmp_path / "bars")
+    for module in (config, bar_store):
+        monkeypatch.setattr(module, "BARS_DIR", bars_dir)
+    monkeypatch.setattr(scraper, "ZACKS_CACHE_DIR", str(tmp_path / "zacks"))
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Serves HISTORIES instead of yfinance; any other ticker fails. Records every call."""
+    calls = []
+
+    def fetch_data(ticker, period="2y", interval="1d", start=None):
+        calls.append(ticker)
+        if ticker not in HISTORIES:
+            raise RuntimeError(f"unknown ticker {ticker}")
+        return HISTORIES[ticker]
+
+    monkeypatch.setattr(client, "fetch_data", fetch_data)
+    return calls
+
+def test_fetch_many_builds_only_requested_intervals(provider):
+    panels, errors = fetch_many(["AAA", "bbb", "ZZZ", "AAA"], intervals=["1wk"])
+    assert list(panels) == ["1wk"]
+    assert list(errors) == ["ZZZ"]
+    weekly = panels["1wk"]
+    assert weekly.index.names == ["Ticker", "Date"]
+    pd.testing.assert_frame_equal(weekly.loc["BBB"], trim_to_period(to_weekly(HISTORIES["BBB"]), 5), check_freq=False)
+    assert sorted(provider) == ["AAA", "BBB", "ZZZ"]
+
+def test_fetch_many_rejects_unknown_intervals(provider):
+    with pytest.raises(ValueError):
+        fetch_many(["AAA"], intervals=["1d", "1h"])
+    assert provider == []
+
+def test_ema_panel_matches_per_ticker_emas():
+    emas = ema_panel(HISTORIES, [9, 50])
+    for ticker, history in HISTORIES.items():
+        expected = calculate_emas(history, [9, 50])[["EMA_9", "EMA_50"]]
+        assert np.allclose(emas.loc[ticker].to_numpy(), expected.to_numpy())
+
+def test_analyze_panels_matches_analyze_ticker(provider):
+    panels, errors = fetch_many(list(HISTORIES))
+    assert not errors
+    results = analyze_panels(panels)
+    for ticker in HISTORIES:
+        frames = [panels[interval].loc[ticker] for interval in ["1d", "1wk", "1mo"]]
+        expected = analyze_ticker(ticker, *frames)[3]
+        for tf in ["daily", "weekly", "monthly"]:
+            assert results[ticker][tf].keys() == expected[tf].keys()
+            for key, diff in expected[tf].items():
+                assert np.isclose(results[ticker][tf][key]["pct_diff"], diff["pct_diff"])
+
+def test_prefetch_key_data(monkeypatch):
+    class FakeTicker:
+        def __init__(self, ticker):
+            self.fast_info = type("FastInfo", (), {attr: len(ticker) for attr in key_data.FAST_FIELDS})()
+            self.info = {"beta": 1.5, "dividendRate": None, "dividendYield": None}
+
+    monkeypatch.setattr(key_data.yf, "Ticker", FakeTicker)
+    snapshots = key_data.prefetch_key_data(["KD1", "KD22", "KD1"])
+    assert list(snapshots) == ["KD1", "KD22"]
+    assert snapshots["KD22"]["marketCap"] == 4 and snapshots["KD1"]["beta"] == 1.5
+
+def test_scrape_many_uses_cache_unless_forced(monkeypatch):
+    calls = []
+    monkeypatch.setattr(scraper, "fetch_zacks_data", lambda ticker: calls.append(ticker) or f"Zacks Rank: {ticker}")
+    # No grace window, so the forced refresh below is not served the result of the first scrape
+    monkeypatch.setattr(scraper._flights, "grace", 0)
+    assert scraper.scrape_many(["ZA", "ZB"]) == {"ZA": "Zacks Rank: ZA", "ZB": "Zacks Rank: ZB"}
+    assert scraper.scrape_many(["ZA", "ZB"]) == {"ZA": "Zacks Rank: ZA", "ZB": "Zacks Rank: ZB"}
+    assert sorted(calls) == ["ZA", "ZB"]
+
+    scraper.scrape_many(["ZA"], force=True)
+    assert calls.count("ZA") == 2
+
+def test_read_window_reads_the_bar_store():
+    history = HISTORIES["AAA"]
+    save_bars("AAA", "1d", history, period="max")
+    # copy(): the stored columns are memory-mapped arrays
+    pd.testing.assert_frame_equal(read_window("AAA", "1Y").copy(), window(history, "1Y"), check_freq=False)
+    assert read_window("NONE", "1Y").empty
+
+if __name__ == "__main__":
+    # The checks need the fixtures above, so they run through pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,55 @@
+import sys
+import os
+import plotly.io as pio
+import plotly.graph_objects as go
+import streamlit.elements.plotly_chart # installs the "streamlit" default template, as in the app
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from bench.fixtures import synthetic_ohlcv
+from src.yfi.analysis import calculate_emas
+from src.market_data import create_chart
+
+FIVE_YEARS = 1260 # daily bars
+MIN_REDUCTION = 10
+
+def full_resolution_chart(hist, show_candles):
+    """The chart as it was drawn before downsampling: every bar, ISO dates, float64 prices."""
+    fig = go.Figure()
+    if show_candles:
+        fig.add_trace(go.Candlestick(x=hist.index, open=hist['Open'], high=hist['High'], low=hist['Low'], close=hist['Close'], name='OHLC'))
+        fig.update_layout(xaxis_rangeslider_visible=False)
+    else:
+        fig.add_trace(go.Scatter(x=hist.index, y=hist['Close'], mode='lines', name='Close'))
+    for col, color in {'EMA_9': 'blue', 'EMA_21': 'orange', 'EMA_50': 'red'}.items():
+        fig.add_trace(go.Scatter(x=hist.index, y=hist[col], mode='lines', name=col, line=dict(color=color, width=1)))
+    fig.update_layout(height=400, margin=dict(l=0, r=0, t=10, b=0), xaxis_title=None, yaxis_title=None)
+    return fig
+
+def payload(fig):
+    return len(pio.to_json(fig, validate=False))
+
+def check_reduction(show_candles):
+    hist = calculate_emas(synthetic_ohlcv(FIVE_YEARS), [9, 21, 50])
+    before = payload(full_resolution_chart(hist, show_candles))
+    after = payload(create_chart("TEST", hist, show_candles))
+    print(f"5Y daily, candles={show_candles}: {before / 1024:.0f} KB -> {after / 1024:.1f} KB ({before / after:.1f}x)")
+    return before / after
+
+def test_line_chart_payload():
+    assert check_reduction(False) >= MIN_REDUCTION
+
+def test_candle_chart_payload():
+    assert check_reduction(True) >= MIN_REDUCTION
+
+def test_full_resolution_keeps_every_bar():
+    hist = calculate_emas(synthetic_ohlcv(FIVE_YEARS), [9, 21, 50])
+    fig = create_chart("TEST", hist, max_points=None)
+    assert all(len(trace.x) == FIVE_YEARS for trace in fig.data)
+
+if __name__ == "__main__":
+    test_line_chart_payload()
+    test_candle_chart_payload()
+    test_full_resolution_keeps_every_bar()
+    print("Chart payload checks passed.")
@@ -0,0 +1,124 @@
+import sys
+import os
+import json
+import tempfile
+import subprocess
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from src.github_sync import CommitQueue, LocalGitBackend, record_path, dump_record, LEGACY_PATH
+
+class RacingBackend(LocalGitBackend):
+    """Lands a competing edit right before our first commit, forcing a conflict and merge."""
+
+    def __init__(self, repo_dir, competing_files):
+        super().__init__(repo_dir)
+        self.competing_files = competing_files
+
+    def commit(self, parent, files, message):
+        if self.competing_files:
+            competing, self.competing_files = self.competing_files, None
+            LocalGitBackend.commit(self, parent, competing, "Concurrent edit")
+        return super().commit(parent, files, message)
+
+def git(repo_dir, *args):
+    return subprocess.run(["git", "--git-dir", repo_dir, *args], capture_output=True, text=True, check=True).stdout.strip()
+
+def make_bare_repo(root, records, legacy=None, name="remote.git"):
+    """Creates a bare repo whose main branch holds the given ticker records (and optionally a legacy ticker_data.json)."""
+    repo_dir = os.path.join(root, name)
+    subprocess.run(["git", "init", "--bare", "-q", "-b", "main", repo_dir], check=True)
+    env = dict(os.environ, GIT_INDEX_FILE=os.path.join(root, f"{name}-index"),
+               GIT_AUTHOR_NAME="seed", GIT_AUTHOR_EMAIL="seed@localhost",
+               GIT_COMMITTER_NAME="seed", GIT_COMMITTER_EMAIL="seed@localhost")
+    files = {record_path(ticker): dump_record(record) for ticker, record in records.items()}
+    if legacy is not None:
+        files[LEGACY_PATH] = json.dumps(legacy, indent=4)
+    for path, content in files.items():
+        blob = subprocess.run(["git", "--git-dir", repo_dir, "hash-object", "-w", "--stdin"], input=content,
+                              capture_output=True, text=True, check=True).stdout.strip()
+        subprocess.run(["git", "--git-dir", repo_dir, "update-index", "--add", "--cacheinfo", f"100644,{blob},{path}"],
+                       env=env, check=True)
+    tree = subprocess.run(["git", "--git-dir", repo_dir, "write-tree"], env=env, capture_output=True, text=True, check=True).stdout.strip()
+    sha = subprocess.run(["git", "--git-dir", repo_dir, "commit-tree", tree, "-m", "seed"], env=env,
+                         capture_output=True, text=True, check=True).stdout.strip()
+    git(repo_dir, "update-ref", "refs/heads/main", sha)
+    return repo_dir
+
+def read_record(repo_dir, ticker):
+    return json.loads(git(repo_dir, "cat-file", "-p", f"main:{record_path(ticker)}"))
+
+def test_github_sync():
+    base_mu = {"company_name": "Micron", "metrics": {"valuation": "old", "rank_info": "old"}}
+    base_nvda = {"company_name": "NVIDIA", "metrics": {}}
+
+    with tempfile.TemporaryDirectory() as root:
+        # 1. Batching: two tickers edited within the window land in one commit
+        repo_dir = make_bare_repo(root, {"MU": base_mu, "NVDA": base_nvda})
+        queue = CommitQueue(LocalGitBackend(repo_dir), delay=60)
+        f1 = queue.submit("MU", {**base_mu, "company_name": "Micron Technology"}, base_mu)
+        f2 = queue.submit("NVDA", {**base_nvda, "product_mix": "GPUs"}, base_nvda)
+        queue.flush()
+        f1.result(), f2.result()
+
+        commits = git(repo_dir, "rev-list", "--count", "main")
+        changed = git(repo_dir, "diff", "--name-only", "main~1", "main").split()
+        if commits != "2" or sorted(changed) != [record_path("MU"), record_path("NVDA")]:
+            print(f"Expected one batched commit touching both records, got {commits} commits: {changed}")
+            return False
+        print("Batched commit OK:", changed)
+
+        # 2. Conflict: a concurrent edit to another field of MU is merged, not overwritten
+        base = read_record(repo_dir, "MU")
+        theirs = json.loads(json.dumps(base))
+        theirs["metrics"]["rank_info"] = "edited elsewhere"
+        ours = json.loads(json.dumps(base))
+        ours["metrics"]["valuation"] = "edited here"
+
+        queue = CommitQueue(RacingBackend(repo_dir, {record_path("MU"): dump_record(theirs)}), delay=60)
+        future = queue.submit("MU", ours, base)
+        queue.flush()
+        committed = future.result()
+
+        merged = read_record(repo_dir, "MU")
+        if merged != committed or merged["metrics"] != {"valuation": "edited here", "rank_info": "edited elsewhere"}:
+            print(f"Merge failed: {merged}")
+            return False
+        print("Conflict retried and merged:", merged["metrics"])
+
+        # 3. Migration: on a branch that only has the legacy file, the first sync commits every record
+        legacy = {"MU": base_mu, "NVDA": base_nvda, "AMD": {"company_name": "AMD", "metrics": {}}}
+        repo_dir = make_bare_repo(root, {}, legacy=legacy, name="legacy.git")
+        queue = CommitQueue(LocalGitBackend(repo_dir), delay=60)
+        future = queue.submit("MU", {**base_mu, "company_name": "Micron Technology"}, base_mu)
+        queue.flush()
+        future.result()
+
+        tracked = git(repo_dir, "ls-tree", "--name-only", "main", "data/tickers/").split()
+        if sorted(tracked) != sorted(record_path(t) for t in legacy) or read_record(repo_dir, "NVDA") != base_nvda:
+            print(f"Expected the first sync to commit every legacy record, got {tracked}")
+            return False
+        if read_record(repo_dir, "MU")["company_name"] != "Micron Technology":
+            print("The edited record was replaced by its legacy copy")
+            return False
+        if git(repo_dir, "ls-tree", "--name-only", "main", LEGACY_PATH):
+            print("The legacy file should be removed by the migration commit")
+            return False
+
+        future = queue.submit("AMD", {"company_name": "AMD", "metrics": {"valuation": "new"}}, legacy["AMD"])
+        queue.flush()
+        future.result()
+        changed = git(repo_dir, "diff", "--name-only", "main~1", "main").split()
+        if changed != [record_path("AMD")]:
+            print(f"Later syncs should only touch the edited record, got {changed}")
+            return False
+        print("Legacy records migrated on first sync:", tracked)
+
+    return True
+
+if __name__ == "__main__":
+    if test_github_sync():
+        print("SUCCESS")
+    else:
+        print("FAILURE")
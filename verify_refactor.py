@@ -4,7 +4,9 @@ import os
 # Add current directory to path so we can import src
 sys.path.append(os.getcwd())
 
-from src.market_data import get_stock_data, save_stock_data, create_chart, save_chart
+from src.market_data import get_stock_data, create_chart, save_chart
+from src.yfi.storage import flush
+from src.yfi.columnar import read_columnar
 from src.config import OUTPUT_DIR
 
 def test_market_data():
@@ -12,24 +14,25 @@ def test_market_data():
     print(f"Testing for {ticker}...")
     
     # 1. Fetch Data
-    stock, hist = get_stock_data(ticker, period="1mo")
+    hist, analysis = get_stock_data(ticker, period="1mo")
     if hist.empty:
         print("Failed to fetch data.")
         return False
     print("Data fetched successfully.")
     
-    # 2. Save Data
-    save_stock_data(ticker, hist)
-    expected_csv = os.path.join(OUTPUT_DIR, ticker, "data.csv")
-    if os.path.exists(expected_csv):
-        print(f"Data saved to {expected_csv}")
+    # 2. Save Data (the pipeline writes it in the background)
+    flush()
+    saved = read_columnar(ticker, "daily", columns=["Close"])
+    if not saved.empty:
+        print(f"Data saved ({len(saved)} daily bars)")
     else:
-        print(f"Failed to save data to {expected_csv}")
+        print(f"Failed to save data for {ticker}")
         return False
 
     # 3. Create & Save Chart
     fig = create_chart(ticker, hist)
     save_chart(ticker, fig)
+    flush()
     expected_html = os.path.join(OUTPUT_DIR, ticker, "chart.html")
     if os.path.exists(expected_html):
         print(f"Chart saved to {expected_html}")
@@ -0,0 +1,47 @@
+import sys
+import os
+import glob
+
+# Add current directory to path so we can import src
+sys.path.append(os.getcwd())
+
+from src.scraper import parse_zacks_html, extract_zacks_stream
+
+FIXTURE_DIR = os.path.join("fixtures", "zacks")
+CHUNK_SIZES = [1, 7, 100, 1024, 16384, 10**7]
+
+def chunked(text, size, consumed):
+    """Yields text in fixed-size chunks, counting how much the extractor pulled."""
+    for i in range(0, len(text), size):
+        consumed[0] += min(size, len(text) - i)
+        yield text[i:i + size]
+
+def test_streaming_extraction():
+    fixtures = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    if not fixtures:
+        print(f"No fixtures found in {FIXTURE_DIR}")
+        return False
+
+    for path in fixtures:
+        with open(path, "r") as f:
+            text = f.read()
+        expected = parse_zacks_html(text)
+        print(f"{os.path.basename(path)}: {expected!r}")
+
+        for size in CHUNK_SIZES:
+            consumed = [0]
+            result = extract_zacks_stream(chunked(text, size, consumed))
+            if result != expected:
+                print(f"Mismatch with chunk size {size}: {result!r}")
+                return False
+            if size == 16384:
+                print(f"  read {consumed[0]:,} of {len(text):,} chars")
+
+    print("Streaming extraction matches full-page parse.")
+    return True
+
+if __name__ == "__main__":
+    if test_streaming_extraction():
+        print("SUCCESS")
+    else:
+        print("FAILURE")
@@ -7,7 +7,8 @@ sys.path.append(os.getcwd())
 
 from src.yfi.client import fetch_all_timeframes
 from src.yfi.analysis import analyze_ticker
-from src.yfi.storage import save_dataframes, save_analysis
+from src.yfi.storage import save_dataframes, save_analysis, flush
+from src.yfi.columnar import read_columnar, export_csv
 from src.config import OUTPUT_DIR
 
 def test_yfi_enhancements():
@@ -33,14 +34,21 @@ def test_yfi_enhancements():
     # 3. Save
     save_dataframes(ticker, daily, weekly, monthly)
     save_analysis(ticker, analysis)
+    flush()
     
     # 4. Verify Files
     ticker_dir = os.path.join(OUTPUT_DIR, ticker)
-    files = ["data_daily.csv", "data_weekly.csv", "data_monthly.csv", "analysis.json"]
+    files = ["columnar/daily/meta.json", "columnar/weekly/meta.json", "columnar/monthly/meta.json", "analysis.json"]
     for f in files:
         if not os.path.exists(os.path.join(ticker_dir, f)):
             print(f"Missing file: {f}")
             return False
+    if len(read_columnar(ticker, "daily")) != len(daily):
+        print("Columnar daily data does not match.")
+        return False
+    if not export_csv(ticker, "daily") or not os.path.exists(os.path.join(ticker_dir, "data_daily.csv")):
+        print("CSV export failed.")
+        return False
             
     # 5. Verify JSON Content
     with open(os.path.join(ticker_dir, "analysis.json"), "r") as f: